@@ -1,89 +1,366 @@
 import os
+import re
+import bisect
+import hashlib
+import json
+import threading
+import time
 import random
 import string
 from datetime import datetime
 from flask import Flask, render_template, jsonify, request, session, redirect, url_for, flash
 import random
 import string
-from datetime import datetime
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for, flash
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.exc import OperationalError, ProgrammingError
+from datetime import datetime, timedelta
+from flask import Flask, render_template, jsonify, request, session, redirect, url_for, flash, abort, g, has_request_context, send_from_directory, stream_with_context
+from markupsafe import Markup
+from sqlalchemy.exc import OperationalError, ProgrammingError, SQLAlchemyError
+from sqlalchemy import and_, event, func, or_
 from sqlalchemy.sql import text
 import logging
 from flask_migrate import Migrate
+from models import db, Event, TicketRequest, configure_db, migration_revision, pool_stats
+from dataset_version import current_version
+from page_cache import create_cache
+from metrics import COUNT_BUCKETS, REGISTRY, SCRAPE_SUMMARY_FILE, Histogram, read_summary, sample_lines
+from ticket_intake import IntakeBusy, create_intake
+from assets import DIST_DIR, AssetManifest, build_assets, precompressed_variant
+from exports import DATASETS, FORMATS, ExportError, export_chunks
+import click
+import hmac
+import mimetypes
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'fallback-secret-key')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///' + os.path.join(os.path.dirname(__file__), 'events.db'))
-if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgres://'):
-    app.config['SQLALCHEMY_DATABASE_URI'] = app.config['SQLALCHEMY_DATABASE_URI'].replace('postgres://', 'postgresql://', 1) + '?sslmode=require'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
+app.config['PAGE_CACHE_BACKEND'] = os.environ.get('PAGE_CACHE_BACKEND', 'memory')
+app.config['PAGE_CACHE_DIR'] = os.environ.get('PAGE_CACHE_DIR')
+app.config['PAGE_CACHE_TTL'] = int(os.environ.get('PAGE_CACHE_TTL', 3600))
+# Events rendered into / and fetched per infinite-scroll request
+app.config['INDEX_PAGE_SIZE'] = int(os.environ.get('INDEX_PAGE_SIZE', 24))
+app.config['TICKET_QUEUE_SIZE'] = int(os.environ.get('TICKET_QUEUE_SIZE', 1000))
+app.config['TICKET_BATCH_SIZE'] = int(os.environ.get('TICKET_BATCH_SIZE', 100))
+app.config['TICKET_FLUSH_INTERVAL'] = float(os.environ.get('TICKET_FLUSH_INTERVAL', 0.05))
+app.config['TICKET_WRITE_ACK'] = os.environ.get('TICKET_WRITE_ACK', 'commit')
+app.config['TICKET_OTP_TTL'] = int(os.environ.get('TICKET_OTP_TTL', 600))
+app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO').upper()
+# /metrics and /api/export/* answer requests with their Bearer token. Trusting loopback clients is opt-in:
+# behind a reverse proxy on the same host every client looks like 127.0.0.1
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+app.config['METRICS_ALLOW_LOOPBACK'] = os.environ.get('METRICS_ALLOW_LOOPBACK', '').lower() in ('1', 'true', 'yes')
+# Serve /metrics to anyone
+app.config['METRICS_ALLOW_REMOTE'] = os.environ.get('METRICS_ALLOW_REMOTE', '').lower() in ('1', 'true', 'yes')
+# /api/export/* includes ticket request emails; it is off unless a token is set (or loopback is opted in)
+app.config['EXPORT_TOKEN'] = os.environ.get('EXPORT_TOKEN')
+app.config['EXPORT_ALLOW_LOOPBACK'] = os.environ.get('EXPORT_ALLOW_LOOPBACK', '').lower() in ('1', 'true', 'yes')
+configure_db(app)
 migrate = Migrate(app, db)
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-app.logger.setLevel(logging.DEBUG)
-
-class Event(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(80), nullable=False)
-    date = db.Column(db.String(120), nullable=False)
-    description = db.Column(db.String(200), nullable=False)
-    url = db.Column(db.String(200), nullable=False)
-    image_url = db.Column(db.String(200), nullable=True)
-
-    @property
-    def display_image_url(self):
-        return self.image_url or f"https://picsum.photos/200/300?random={self.id}"
-
-class TicketRequest(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(120), nullable=False)
-    event_url = db.Column(db.String(200), nullable=False)
-    dob = db.Column(db.Date, nullable=False)
-    otp = db.Column(db.String(6), nullable=True)
-    verified = db.Column(db.Boolean, default=False)
+# Configure logging; DEBUG is opt-in (LOG_LEVEL=DEBUG) so request paths don't pay for it
+logging.basicConfig(level=app.config['LOG_LEVEL'])
+app.logger.setLevel(app.config['LOG_LEVEL'])
 
 FIXED_OTP = "649358"
 
+page_cache = create_cache(app.config['PAGE_CACHE_BACKEND'], directory=app.config['PAGE_CACHE_DIR'], ttl=app.config['PAGE_CACHE_TTL'])
+ticket_writer, otp_store = create_intake(app)
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Request latency by route.')
+REQUEST_DB_QUERIES = Histogram('http_request_db_queries', 'Database queries per request by route.', buckets=COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram('http_request_db_seconds', 'Time spent in database queries per request by route.')
+
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_seconds += time.perf_counter() - conn.info.pop('query_started', time.perf_counter())
+
+with app.app_context():
+    event.listen(db.engine, 'before_cursor_execute', _query_started)
+    event.listen(db.engine, 'after_cursor_execute', _query_finished)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_started' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.observe(time.perf_counter() - g.request_started, route=route, method=request.method, status=response.status_code)
+        REQUEST_DB_QUERIES.observe(g.db_queries, route=route)
+        REQUEST_DB_SECONDS.observe(g.db_seconds, route=route)
+    return response
+
+def collect_process_metrics():
+    pool = pool_stats()
+    lines = sample_lines('db_pool_checkout_wait_seconds_total', 'Time spent waiting for a pooled connection.', 'counter',
+                         {(): pool.get('wait_seconds', 0.0)})
+    lines += sample_lines('db_pool_checkouts_total', 'Pooled connection checkouts.', 'counter',
+                          {(): pool.get('checkouts', 0)})
+    lines += sample_lines('ticket_writer_operations_total', 'Ticket intake operations by outcome.', 'counter',
+                          {(('outcome', name),): value for name, value in ticket_writer.stats.items()})
+    summary = read_summary(SCRAPE_SUMMARY_FILE)
+    if summary:
+        lines += sample_lines('scraper_last_run_stage_seconds', 'Wall time per stage of the last scrape.', 'gauge',
+                              {(('mode', summary.get('mode')), ('stage', stage)): entry['seconds']
+                               for stage, entry in summary.get('stages', {}).items()})
+        lines += sample_lines('scraper_last_run_events', 'Events synced by the last scrape.', 'gauge',
+                              {(('mode', summary.get('mode')),): summary.get('events', 0)})
+    return lines
+
+REGISTRY.collectors.append(collect_process_metrics)
+
+# Downloaded images, their thumbnails and built assets have content-derived names and never change
+IMMUTABLE_STATIC_PREFIXES = ('/static/images/', '/assets/')
+
+@app.after_request
+def add_cache_headers(response):
+    if request.path.startswith(IMMUTABLE_STATIC_PREFIXES) and response.status_code == 200 and not request.path.endswith('.json'):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+    return response
+
+asset_manifest = AssetManifest()
+
+@app.template_global()
+def asset_url(path):
+    """URL of the built copy of static/<path> (see assets.py), or of the source file before the first build."""
+    built_name = asset_manifest.lookup(path)
+    if built_name:
+        return url_for('built_asset', filename=built_name)
+    return url_for('static', filename=path)
+
+@app.route('/assets/<path:filename>')
+def built_asset(filename):
+    # Serve the .br / .gz file written at build time instead of compressing per request
+    variant, encoding = precompressed_variant(DIST_DIR, filename, request.accept_encodings)
+    response = send_from_directory(DIST_DIR, variant, mimetype=mimetypes.guess_type(filename)[0])
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+# Fields the infinite-scroll script needs to build a card
+CARD_API_FIELDS = ('name', 'date', 'description', 'url', 'image_url', 'image_srcset')
+
 @app.route('/')
 def index():
-    try:
-        events = Event.query.all()
-        return render_template('index.html', events=events)
-    except (OperationalError, ProgrammingError) as e:
-        app.logger.error(f"Database error in index: {str(e)}")
-        return render_template('index.html', events=[], error="Unable to load events due to a database issue. Please try again later.")
+    # Only the first page of events is rendered; static/js/scripts.js fetches
+    # the rest from /api/events as the visitor scrolls, and ?cursor= pages
+    # serve browsers without JavaScript. Each page is identical for every
+    # visitor, so it is rendered once per dataset version; flashes and the
+    # OTP form stay per-request in index.html
+    cursor = request.args.get('cursor', type=int)
+    cache_key = f"event-list:{current_version()}:{cursor or ''}"
+    events_html = page_cache.get(cache_key)
+    if events_html is None:
+        page_size = app.config['INDEX_PAGE_SIZE']
+        try:
+            events, next_cursor = query_events(cursor=cursor, limit=page_size)
+        except (OperationalError, ProgrammingError) as e:
+            app.logger.error(f"Database error in index: {str(e)}")
+            return render_template('index.html', events_html='', error="Unable to load events due to a database issue. Please try again later.")
+        events_html = render_template('_event_list.html', events=events, next_cursor=next_cursor,
+                                      page_size=page_size, api_fields=','.join(CARD_API_FIELDS))
+        page_cache.set(cache_key, events_html)
+    return render_template('index.html', events_html=Markup(events_html))
+
+EVENT_API_FIELDS = ('id', 'name', 'date', 'starts_at', 'description', 'url', 'image_url', 'image_srcset', 'city', 'source')
+DEFAULT_EVENT_API_FIELDS = ('name', 'date', 'description', 'url', 'image_url')
+MAX_EVENT_API_LIMIT = 500
+
+# Serialized events for the current dataset version, shared by all requests in this worker
+_events_payload = {'version': None, 'ids': [], 'rows': [], 'full_json': None}
+_events_payload_lock = threading.Lock()
+
+def serialize_event(event):
+    return {
+        'id': event.id,
+        'name': event.name,
+        'date': event.date,
+        'starts_at': event.starts_at.isoformat() if event.starts_at else None,
+        'description': event.description,
+        'url': event.url,
+        'image_url': event.display_image_url,
+        'image_srcset': event.display_image_srcset,
+        'city': event.city,
+        'source': event.source
+    }
+
+def load_events_payload():
+    """Return the serialized event list, rebuilding it only when the dataset version changed."""
+    version = current_version()
+    payload = _events_payload
+    if payload['version'] == version:
+        return payload
+    with _events_payload_lock:
+        if _events_payload['version'] != version:
+            rows = [serialize_event(event) for event in Event.query.order_by(Event.id).all()]
+            full = [{field: row[field] for field in DEFAULT_EVENT_API_FIELDS} for row in rows]
+            _events_payload.update({
+                'version': version,
+                'ids': [row['id'] for row in rows],
+                'rows': rows,
+                'full_json': json.dumps(full),
+            })
+            app.logger.info(f"Rebuilt /api/events payload for version {version}: {len(rows)} events")
+    return _events_payload
+
+_fts_available = {}
+
+def event_search_filter(q):
+    """SQL condition matching ``q`` against name/description through the search index.
+
+    Uses the FTS5 table on SQLite and the GIN tsvector index on Postgres (both
+    created by migration a3c5d9e1f2b4), with a LIKE scan as the fallback.
+    """
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        return None
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        if dialect not in _fts_available:
+            _fts_available[dialect] = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_fts'")).first() is not None
+        if _fts_available[dialect]:
+            match = ' '.join(f'"{term}"*' for term in terms)
+            return Event.id.in_(text("SELECT rowid FROM event_fts WHERE event_fts MATCH :match")
+                                .bindparams(match=match).columns(rowid=db.Integer))
+    elif dialect == 'postgresql':
+        document = func.to_tsvector('english', func.coalesce(Event.name, '') + ' ' + func.coalesce(Event.description, ''))
+        return document.op('@@')(func.plainto_tsquery('english', ' '.join(terms)))
+    return and_(*[or_(Event.name.ilike(f"%{term}%"), Event.description.ilike(f"%{term}%")) for term in terms])
+
+def query_events(q=None, date_from=None, date_to=None, upcoming=False, cursor=None, limit=None, city=None):
+    """Filtered, keyset-paginated event query. Returns (events, next_cursor).
+
+    With ``upcoming`` only events starting from now are returned, soonest first,
+    and the cursor is ``<starts_at>_<id>``; otherwise events are ordered by id
+    and the cursor is the last id.
+    """
+    query = Event.query
+    if q:
+        condition = event_search_filter(q)
+        if condition is not None:
+            query = query.filter(condition)
+    if date_from:
+        query = query.filter(Event.starts_at >= date_from)
+    if date_to:
+        query = query.filter(Event.starts_at < date_to)
+    if city:
+        query = query.filter(Event.city == city)
+
+    if upcoming:
+        query = query.filter(Event.starts_at >= datetime.now()).order_by(Event.starts_at, Event.id)
+        if cursor:
+            cursor_start, cursor_id = cursor.rsplit('_', 1)
+            cursor_start = datetime.fromisoformat(cursor_start)
+            query = query.filter(or_(Event.starts_at > cursor_start,
+                                     and_(Event.starts_at == cursor_start, Event.id > int(cursor_id))))
+    else:
+        query = query.order_by(Event.id)
+        if cursor:
+            query = query.filter(Event.id > int(cursor))
+
+    if limit is None:
+        return query.all(), None
+    events = query.limit(limit + 1).all()
+    if len(events) <= limit:
+        return events, None
+    events = events[:limit]
+    last = events[-1]
+    return events, (f"{last.starts_at.isoformat()}_{last.id}" if upcoming else str(last.id))
 
 @app.route('/api/events')
 def get_events():
+    """List events.
+
+    Optional query parameters: ``limit`` (page size, max 500), ``cursor`` (from
+    the previous page's ``X-Next-Cursor`` header), ``fields`` (comma-separated
+    subset of the event fields), ``q`` (full-text search), ``from``/``to``
+    (inclusive YYYY-MM-DD range on the start date), ``city`` and ``sort=upcoming``. The
+    body is always a JSON array; a ``Link`` header points at the next page.
+    """
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor') or None
+    fields = tuple(f for f in request.args.get('fields', '').split(',') if f) or DEFAULT_EVENT_API_FIELDS
+    if any(field not in EVENT_API_FIELDS for field in fields):
+        return jsonify({'error': f"fields must be a subset of {', '.join(EVENT_API_FIELDS)}"}), 400
+    if limit is not None:
+        limit = max(1, min(limit, MAX_EVENT_API_LIMIT))
+    q = request.args.get('q', '').strip()
+    city = request.args.get('city', '').strip()
+    sort = request.args.get('sort', 'id')
+    if sort not in ('id', 'upcoming'):
+        return jsonify({'error': "sort must be 'id' or 'upcoming'"}), 400
+    try:
+        date_from = datetime.fromisoformat(request.args['from']) if request.args.get('from') else None
+        date_to = datetime.fromisoformat(request.args['to']) + timedelta(days=1) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'from/to must be YYYY-MM-DD dates'}), 400
+
+    # The ETag only depends on the dataset version and the query, so a matching
+    # If-None-Match is answered without touching the database. "upcoming"
+    # results also depend on the clock, so they roll over every minute.
+    version = current_version()
+    clock = datetime.now().strftime('%Y%m%d%H%M') if sort == 'upcoming' else ''
+    etag = hashlib.sha1(f"{version}|{clock}|{sorted(request.args.items(multi=True))}".encode()).hexdigest()[:20]
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    next_cursor = None
     try:
-        events = Event.query.all()
-        return jsonify([{
-            'name': event.name,
-            'date': event.date,
-            'description': event.description,
-            'url': event.url,
-            'image_url': event.display_image_url
-        } for event in events])
+        if q or date_from or date_to or city or sort == 'upcoming':
+            # Filtered queries go to the database, served by the indexes on starts_at/city and the search index
+            events, next_cursor = query_events(q, date_from, date_to, sort == 'upcoming', cursor, limit, city=city)
+            body = json.dumps([{field: row[field] for field in fields} for row in map(serialize_event, events)])
+        else:
+            payload = load_events_payload()
+            if limit is None and cursor is None and fields == DEFAULT_EVENT_API_FIELDS:
+                body = payload['full_json']
+            else:
+                start = bisect.bisect_right(payload['ids'], int(cursor)) if cursor is not None else 0
+                end = len(payload['rows']) if limit is None else start + limit
+                page = payload['rows'][start:end]
+                if end < len(payload['rows']) and page:
+                    next_cursor = str(page[-1]['id'])
+                body = json.dumps([{field: row[field] for field in fields} for row in page])
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except (OperationalError, ProgrammingError) as e:
         app.logger.error(f"Database error in get_events: {str(e)}")
         return jsonify({'error': 'Database error occurred'}), 500
 
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    if next_cursor is not None:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for("get_events", **args)}>; rel="next"'
+    return response
+
 @app.route('/get_tickets', methods=['POST'])
 def get_tickets():
+    # Submissions and verifications go through ticket_writer, which commits them
+    # in batches; see ticket_intake for the durability guarantees
     try:
         otp = request.form.get('otp')
         event_url = request.form.get('url')
-        app.logger.debug(f"Received form data: url={event_url}, otp={otp}")
 
         # If OTP is not provided, process initial ticket request
         if not otp:
             email = request.form.get('email')
             dob = request.form.get('dob')
-            app.logger.debug(f"Initial request: email={email}, dob={dob}")
 
             if not email or not event_url or not dob:
                 flash('Email, URL, and DOB are required.', 'error')
@@ -94,59 +371,159 @@ def get_tickets():
                 app.logger.error(f"DOB parsing error: {str(e)}")
                 flash('Invalid DOB format (use YYYY-MM-DD).', 'error')
                 return redirect(url_for('index'))
-            
-            ticket_request = TicketRequest(email=email, event_url=event_url, dob=dob_date, otp=FIXED_OTP, verified=False)
-            db.session.add(ticket_request)
-            db.session.commit()
-            app.logger.info(f"Ticket request saved: ID={ticket_request.id}, OTP={FIXED_OTP}")
-            session['ticket_id'] = ticket_request.id
+
+            ticket_key = ticket_writer.submit(email=email, event_url=event_url, dob=dob_date, otp=FIXED_OTP)
+            otp_store.put(ticket_key, FIXED_OTP, event_url, email)
+            session['ticket_key'] = ticket_key
             session['event_url'] = event_url
             flash('Please enter the OTP to verify.', 'info')
-            return redirect(url_for('index', ticket_id=ticket_request.id))
+            return redirect(url_for('index', ticket_key=ticket_key))
 
         # If OTP is provided, verify it
-        ticket_id = session.get('ticket_id')
-        if not ticket_id:
+        ticket_key = session.get('ticket_key')
+        if not ticket_key:
             flash('No ticket request found. Please submit ticket details again.', 'error')
             return redirect(url_for('index'))
 
-        ticket_request = TicketRequest.query.get(ticket_id)
-        if not ticket_request or ticket_request.event_url != event_url:
+        pending = otp_store.get(ticket_key)
+        if pending is None:
+            # Expired, or submitted to another worker: the database has the request
+            ticket_request = TicketRequest.query.filter_by(request_key=ticket_key).first()
+            if ticket_request is not None:
+                pending = (ticket_request.otp, ticket_request.event_url, ticket_request.email)
+        expected_otp, expected_url, email = pending or (None, None, None)
+        if not pending or expected_url != event_url:
             flash('Invalid ticket request.', 'error')
-            session.pop('ticket_id', None)
+            session.pop('ticket_key', None)
             session.pop('event_url', None)
             return redirect(url_for('index'))
 
-        if otp == ticket_request.otp:
-            ticket_request.verified = True
-            db.session.commit()
-            app.logger.info(f"OTP verified for ticket ID={ticket_id}, email={ticket_request.email}")
-            flash(f'OTP verified for {ticket_request.email}! Redirecting to event page.', 'success')
+        if otp == expected_otp:
+            ticket_writer.mark_verified(ticket_key)
+            otp_store.discard(ticket_key)
+            app.logger.info(f"OTP verified for ticket request {ticket_key}")
+            flash(f'OTP verified for {email}! Redirecting to event page.', 'success')
             # Clear session data
-            session.pop('ticket_id', None)
+            session.pop('ticket_key', None)
             session.pop('event_url', None)
-            return redirect(ticket_request.event_url)
+            return redirect(expected_url)
         else:
-            app.logger.warning(f"Wrong OTP entered: {otp}")
+            app.logger.warning(f"Wrong OTP entered for ticket request {ticket_key}")
             flash('Incorrect OTP. Please try again.', 'error')
-            return redirect(url_for('index', ticket_id=ticket_id))
+            return redirect(url_for('index', ticket_key=ticket_key))
 
+    except IntakeBusy:
+        app.logger.warning("Ticket queue is full, asking the client to retry")
+        flash('We are receiving a lot of ticket requests right now. Please try again in a moment.', 'error')
+        return redirect(url_for('index'))
+    except SQLAlchemyError as e:
+        # The statement parameters in the message are the visitor's email, dob and OTP
+        db.session.rollback()
+        app.logger.error(f"Ticket request database error: {type(e).__name__}")
+        flash('Failed to process ticket request. Please try again.', 'error')
+        return redirect(url_for('index'))
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Ticket request error: {str(e)}")
         flash(f'Failed to process ticket request: {str(e)}', 'error')
         return redirect(url_for('index'))
-        
-def check_migration_status():
+
+def request_authorized(token, allow_loopback=False):
+    """True if the request sends ``Authorization: Bearer <token>``, or ``allow_loopback`` is set and it comes from loopback."""
+    if token and hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return True
+    return allow_loopback and request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    if not app.config['METRICS_ALLOW_REMOTE'] and not request_authorized(
+            app.config['METRICS_TOKEN'], app.config['METRICS_ALLOW_LOOPBACK']):
+        abort(404)
+    return app.response_class(REGISTRY.expose(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/export/<dataset>')
+def export(dataset):
+    """Stream a whole table (``events`` or ``ticket-requests``) for bulk analytics.
+
+    Query parameters: ``format`` (ndjson, csv or parquet), ``since_id`` and
+    ``since`` (ISO timestamp) for incremental exports; see exports.py.
+    """
+    if not request_authorized(app.config['EXPORT_TOKEN'], app.config['EXPORT_ALLOW_LOOPBACK']):
+        abort(404)
+    fmt = request.args.get('format', 'ndjson')
     try:
-        with app.app_context():
-            db.session.execute(text('SELECT * FROM alembic_version'))
-            app.logger.info("Alembic version table exists, migrations are set up.")
-    except (OperationalError, ProgrammingError) as e:
-        app.logger.warning(f"Migration check failed: {str(e)}. Ensure migrations are applied with 'flask db upgrade'.")
+        since = datetime.fromisoformat(request.args['since']) if request.args.get('since') else None
+    except ValueError:
+        return jsonify({'error': 'since must be an ISO 8601 timestamp'}), 400
+    try:
+        since_id = int(request.args['since_id']) if request.args.get('since_id') else None
+    except ValueError:
+        return jsonify({'error': 'since_id must be an integer'}), 400
+    try:
+        chunks = export_chunks(dataset, fmt, since_id, since)
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    # Rows are read and sent batch by batch while the response streams
+    response = app.response_class(stream_with_context(chunks), mimetype=FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    response.cache_control.no_store = True
+    return response
+
+def migration_heads():
+    from alembic.script import ScriptDirectory
+    return set(ScriptDirectory.from_config(migrate.get_config()).get_heads())
+
+@app.route('/healthz')
+def healthz():
+    """Liveness/readiness probe: one cheap query, the applied migration revision and pool wait stats."""
+    try:
+        revision = migration_revision()
+    except OperationalError as e:
+        app.logger.error(f"Health check failed: {str(e)}")
+        return jsonify({'status': 'error', 'database': 'unreachable'}), 503
+    return jsonify({'status': 'ok', 'database': 'ok', 'migration': revision, 'pool': pool_stats()})
+
+@app.cli.command('check-migrations')
+def check_migrations_command():
+    """Exit non-zero unless the database is at the latest migration."""
+    revision = migration_revision()
+    heads = migration_heads()
+    if revision in heads:
+        print(f"Database is at the latest migration ({revision}).")
+        return
+    print(f"Database is at {revision or 'no migration'}, expected {', '.join(sorted(heads))}. "
+          f"Run 'flask db upgrade'.")
+    raise SystemExit(1)
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Minify, fingerprint and precompress static/css and static/js into static/dist."""
+    manifest = build_assets()
+    for path, built_name in sorted(manifest.items()):
+        print(f"{path} -> {built_name}")
+
+@app.cli.command('export')
+@click.argument('dataset', type=click.Choice(list(DATASETS)))
+@click.option('--format', 'fmt', type=click.Choice(list(FORMATS)), default='ndjson', show_default=True)
+@click.option('--since-id', type=int, help='Only rows with a larger id.')
+@click.option('--since', type=click.DateTime(), help='Only rows changed/created at or after this time.')
+@click.option('--output', '-o', default='-', help='File to write (default: stdout).')
+def export_command(dataset, fmt, since_id, since, output):
+    """Stream a table to NDJSON, CSV or Parquet without loading it into memory."""
+    try:
+        chunks = export_chunks(dataset, fmt, since_id, since)
+    except ExportError as e:
+        raise click.ClickException(str(e))
+    with click.open_file(output, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
 
-# Run migration check after app initialization
-check_migration_status()
+# Optionally run the scraper scheduler inside the web process; the scrape
+# lock keeps multiple workers from scraping at the same time
+if os.environ.get('SCRAPER_EMBEDDED', '').lower() in ('1', 'true', 'yes'):
+    from scrape_scheduler import start_background_scheduler
+    start_background_scheduler()
 
 if __name__ == '__main__':
     app.run(debug=True)
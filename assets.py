@@ -0,0 +1,158 @@
+"""Build step for the CSS and JavaScript under static/.
+
+``build_assets()`` minifies every ``static/css/*.css`` and ``static/js/*.js``
+file and writes it to ``static/dist`` under a content-hash name
+(``css/styles.1a2b3c4d5e.css``), with ``.gz`` and, when the ``brotli``
+package is installed, ``.br`` variants next to it. ``manifest.json`` maps
+each source path to its built name. Since a built file's name changes
+with its content, it can be cached forever; ``AssetManifest`` turns
+source paths into those URLs and ``precompressed_variant()`` picks the
+variant the client accepts.
+
+rcssmin / rjsmin are used when installed, otherwise a conservative
+built-in minifier that only drops comments and whitespace.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from rcssmin import cssmin
+except ImportError:
+    cssmin = None
+
+try:
+    from rjsmin import jsmin
+except ImportError:
+    jsmin = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_FILE = 'manifest.json'
+SOURCE_PATTERNS = {'css': '.css', 'js': '.js'}
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def minify_css(text):
+    if cssmin:
+        return cssmin(text)
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    # Spaces before ':' are kept; in a selector they are a descendant combinator
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    if jsmin:
+        return jsmin(text)
+    # Without a tokenizer only whole-line comments and indentation are safe to drop
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def _write(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_assets(static_dir=STATIC_DIR, dist_dir=DIST_DIR):
+    """Minify, fingerprint and precompress the CSS/JS sources; returns the new manifest.
+
+    Built files from earlier builds that the new manifest no longer
+    references are removed.
+    """
+    manifest = {}
+    for subdir, extension in SOURCE_PATTERNS.items():
+        source_dir = os.path.join(static_dir, subdir)
+        if not os.path.isdir(source_dir):
+            continue
+        os.makedirs(os.path.join(dist_dir, subdir), exist_ok=True)
+        for file_name in sorted(os.listdir(source_dir)):
+            if not file_name.endswith(extension):
+                continue
+            with open(os.path.join(source_dir, file_name), encoding='utf-8') as f:
+                data = MINIFIERS[extension](f.read()).encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            built_name = f"{subdir}/{file_name[:-len(extension)]}.{digest}{extension}"
+            built_path = os.path.join(dist_dir, built_name)
+            _write(built_path, data)
+            # mtime=0 keeps the .gz bytes identical across builds
+            _write(built_path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli:
+                _write(built_path + '.br', brotli.compress(data, quality=11))
+            manifest[f"{subdir}/{file_name}"] = built_name
+            logging.info(f"Built {built_name} ({len(data)} bytes)")
+
+    _write(os.path.join(dist_dir, MANIFEST_FILE), json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+
+    keep = {MANIFEST_FILE}
+    for built_name in manifest.values():
+        keep.update(built_name + suffix for suffix in ('', '.gz', '.br'))
+    for subdir in SOURCE_PATTERNS:
+        subdir_path = os.path.join(dist_dir, subdir)
+        if not os.path.isdir(subdir_path):
+            continue
+        for file_name in os.listdir(subdir_path):
+            if f"{subdir}/{file_name}" not in keep:
+                os.remove(os.path.join(subdir_path, file_name))
+    return manifest
+
+
+class AssetManifest:
+    """Maps source asset paths to built names, re-reading manifest.json when it changes."""
+
+    def __init__(self, dist_dir=DIST_DIR):
+        self.path = os.path.join(dist_dir, MANIFEST_FILE)
+        self._mtime = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def entries(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return {}
+        if mtime != self._mtime:
+            with self._lock:
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    self._entries = {}
+                self._mtime = mtime
+        return self._entries
+
+    def lookup(self, path):
+        """Built name for ``path`` (e.g. 'css/styles.css'), or None when it has not been built."""
+        return self.entries().get(path)
+
+
+def precompressed_variant(dist_dir, filename, accept_encodings):
+    """Return (file name, Content-Encoding) of the best variant of ``filename`` the client accepts.
+
+    ``accept_encodings`` is the request's parsed ``Accept-Encoding``
+    (``request.accept_encodings``); falls back to the uncompressed file.
+    """
+    for encoding, suffix in ENCODINGS:
+        if accept_encodings[encoding] > 0 and os.path.isfile(os.path.join(dist_dir, filename + suffix)):
+            return filename + suffix, encoding
+    return filename, None
@@ -0,0 +1,348 @@
+"""Load benchmark for the web endpoints.
+
+Seeds a throwaway database with synthetic events, serves the app with a
+local WSGI server in a child process and drives /, /api/events and
+/get_tickets with concurrent keep-alive clients:
+
+    python -m benchmarks.load_test --sizes 100 10000 100000 --output load.json
+    python -m benchmarks.load_test --save-baseline benchmarks/baselines/load.json
+    python -m benchmarks.load_test --baseline benchmarks/baselines/load.json
+    python -m benchmarks.load_test --postgres-url postgresql://localhost/events_bench
+
+Each scenario reports p50/p95/p99 latency, throughput, errors and the
+server's resident memory. The schema is built by the real migrations, so
+the FTS5 / GIN search indexes are in place. ``--postgres-url`` adds a
+Postgres run next to SQLite; that database is wiped. ``--baseline`` compares
+against a saved report and exits non-zero when a p95 or throughput figure
+regresses by more than ``--tolerance``; ``--save-baseline`` writes one.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORDS = ('jazz', 'market', 'festival', 'comedy', 'harbour', 'food', 'wine', 'art', 'tech', 'yoga', 'film',
+         'theatre', 'night', 'family', 'workshop', 'rooftop', 'sunset', 'vintage', 'beach', 'music')
+SEARCH_TERMS = ('jazz', 'harbour festival', 'rooftop', 'vintage market', 'comedy night')
+
+# name -> (method, path or path factory, form body)
+SCENARIOS = {
+    'index': ('GET', '/', None),
+    'events_full': ('GET', '/api/events', None),
+    'events_page': ('GET', lambda rng, size: '/api/events?' + urlencode(
+        {'limit': 50, 'cursor': rng.randrange(max(1, size - 50))}), None),
+    'events_search': ('GET', lambda rng, size: '/api/events?' + urlencode(
+        {'q': rng.choice(SEARCH_TERMS), 'limit': 50}), None),
+    'events_upcoming': ('GET', '/api/events?sort=upcoming&limit=50', None),
+    'tickets': ('POST', '/get_tickets', lambda rng: urlencode(
+        {'email': f"load{rng.randrange(10 ** 9)}@example.com", 'url': 'https://example.com/e/1', 'dob': '1990-01-01'})),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def create_schema(database_url):
+    """Reset ``database_url`` to the pre-migration schema, then apply every migration."""
+    from flask import Flask
+    from flask_migrate import Migrate, upgrade
+    import sqlalchemy as sa
+    from models import configure_db, db
+
+    flask_app = Flask('load_test')
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    configure_db(flask_app)
+    Migrate(flask_app, db, directory=os.path.join(REPO_DIR, 'migrations'))
+    with flask_app.app_context():
+        with db.engine.begin() as conn:
+            for table in ('event_fts', 'scrape_run', 'ticket_request', 'event', 'alembic_version'):
+                conn.execute(sa.text(f"DROP TABLE IF EXISTS {table}" + (' CASCADE' if conn.dialect.name == 'postgresql' else '')))
+        # The first migration alters the tables as they existed before migrations were added
+        baseline = sa.MetaData()
+        sa.Table('event', baseline,
+                 sa.Column('id', sa.Integer, primary_key=True),
+                 sa.Column('name', sa.String(80), nullable=False),
+                 sa.Column('date', sa.String(120), nullable=False),
+                 sa.Column('description', sa.String(200), nullable=False),
+                 sa.Column('url', sa.String(200), nullable=False))
+        sa.Table('ticket_request', baseline,
+                 sa.Column('id', sa.Integer, primary_key=True),
+                 sa.Column('email', sa.String(120), nullable=False),
+                 sa.Column('event_url', sa.String(200), nullable=False))
+        baseline.create_all(db.engine)
+        upgrade(directory=os.path.join(REPO_DIR, 'migrations'))
+    return flask_app
+
+
+def seed_events(flask_app, size, seed=0):
+    """Insert ``size`` synthetic events in batches."""
+    from sqlalchemy import insert
+    from models import Event, db
+
+    rng = random.Random(seed)
+    now = datetime.now().replace(second=0, microsecond=0)
+    with flask_app.app_context():
+        for start in range(0, size, 5000):
+            rows = []
+            for i in range(start, min(size, start + 5000)):
+                words = rng.sample(WORDS, 3)
+                starts_at = now + timedelta(hours=rng.randrange(-24 * 30, 24 * 180))
+                rows.append({
+                    'name': f"{words[0].title()} {words[1].title()} Sydney #{i}",
+                    'date': starts_at.strftime('%a, %b %d • %I:%M %p'),
+                    'starts_at': starts_at,
+                    'description': f"A {words[0]} and {words[1]} evening with {words[2]} in Sydney.",
+                    'url': f"https://www.eventbrite.com.au/e/load-{i}",
+                    'image_url': None,
+                    'fingerprint': None,
+                })
+            db.session.execute(insert(Event), rows)
+        db.session.commit()
+
+
+def server_rss_mb(pid):
+    """Resident memory of ``pid`` and its children in MiB, or None off Linux."""
+    total, pending = 0, [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/status", encoding='ascii') as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+            with open(f"/proc/{current}/task/{current}/children", encoding='ascii') as f:
+                pending.extend(int(child) for child in f.read().split())
+    except (OSError, StopIteration):
+        return None if total == 0 else round(total / 1024, 1)
+    return round(total / 1024, 1)
+
+
+def start_server(env, port, server, workers, threads, log_path):
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--threads', str(threads),
+                   '--bind', f"127.0.0.1:{port}", '--log-level', 'warning', 'app:app']
+    else:
+        command = [sys.executable, '-m', 'benchmarks.load_test', 'serve', '--port', str(port)]
+    with open(log_path, 'ab') as log:
+        process = subprocess.Popen(command, cwd=REPO_DIR, env=env, start_new_session=True,
+                                   stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            with open(log_path, encoding='utf-8', errors='replace') as log:
+                raise RuntimeError(f"server exited: {log.read()[-2000:]}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/healthz')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError("server did not become healthy within 60s")
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def run_scenario(port, name, size, concurrency, duration, warmup):
+    """Hammer one scenario with ``concurrency`` clients for ``duration`` seconds.
+
+    Every client finishes at least one warm-up request and one measured
+    request, so slow endpoints still report latencies; throughput is over
+    the measured phase's actual length.
+    """
+    method, path, body = SCENARIOS[name]
+    latencies, errors, finished = [], [], []
+    lock = threading.Lock()
+    phase = {}
+    barrier = threading.Barrier(concurrency, action=lambda: phase.update(
+        started=time.monotonic(), stop_at=time.monotonic() + duration))
+
+    def client(index):
+        rng = random.Random(index)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+
+        def request():
+            nonlocal conn
+            target = path(rng, size) if callable(path) else path
+            payload = body(rng) if body else None
+            headers = {'Content-Type': 'application/x-www-form-urlencoded'} if payload else {}
+            try:
+                conn.request(method, target, body=payload, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                return response.status >= 400
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+                return True
+
+        warmup_until = time.monotonic() + warmup
+        request()
+        while time.monotonic() < warmup_until:
+            request()
+        barrier.wait()
+
+        local_latencies, local_errors = [], 0
+        while not local_latencies or time.monotonic() < phase['stop_at']:
+            started = time.monotonic()
+            local_errors += request()
+            local_latencies.append(time.monotonic() - started)
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+            finished.append(time.monotonic())
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    elapsed = max(finished) - phase['started']
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def run_backend(label, database_url, args, workspace):
+    results = {}
+    for size in args.sizes:
+        seeded = time.perf_counter()
+        flask_app = create_schema(database_url)
+        seed_events(flask_app, size)
+        seed_seconds = round(time.perf_counter() - seeded, 2)
+
+        env = dict(os.environ, DATABASE_URL=database_url, LOG_LEVEL='WARNING', SCRAPER_EMBEDDED='',
+                   EVENTS_VERSION_FILE=os.path.join(workspace, f"{label}-{size}.version"),
+                   SCRAPER_METRICS_FILE='', PYTHONPATH=REPO_DIR)
+        port = free_port()
+        process = start_server(env, port, args.server, args.workers, args.threads,
+                               os.path.join(workspace, f"{label}-{size}.log"))
+        try:
+            scenarios = {}
+            for name in args.scenarios:
+                scenarios[name] = run_scenario(port, name, size, args.concurrency, args.duration, args.warmup)
+                scenarios[name]['server_rss_mb'] = server_rss_mb(process.pid)
+                print(f"{label:8} {size:>7} {name:16} {json.dumps(scenarios[name])}", file=sys.stderr)
+        finally:
+            stop_server(process)
+        results[str(size)] = {'seed_seconds': seed_seconds, 'scenarios': scenarios}
+    return results
+
+
+def compare(report, baseline, tolerance):
+    """Return human-readable regressions of ``report`` against ``baseline``."""
+    regressions = []
+    for backend, sizes in report['results'].items():
+        for size, result in sizes.items():
+            for name, current in result['scenarios'].items():
+                previous = baseline.get('results', {}).get(backend, {}).get(size, {}).get('scenarios', {}).get(name)
+                if not previous:
+                    continue
+                where = f"{backend}/{size}/{name}"
+                if previous.get('p95_ms') and current.get('p95_ms') and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                    regressions.append(f"{where}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+                if previous.get('throughput_rps') and current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+                    regressions.append(f"{where}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps")
+    return regressions
+
+
+def serve(port):
+    """Threaded Werkzeug server, for hosts without gunicorn."""
+    from werkzeug.serving import make_server
+    from app import app
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', nargs='?', choices=('run', 'serve'), default='run')
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000])
+    parser.add_argument('--scenarios', nargs='+', choices=tuple(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients (default 16)')
+    parser.add_argument('--duration', type=float, default=10.0, help='measured seconds per scenario (default 10)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='unmeasured seconds before each scenario (default 2)')
+    parser.add_argument('--server', choices=('gunicorn', 'werkzeug'), default='gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes (default 2)')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker (default 4)')
+    parser.add_argument('--postgres-url', default=os.environ.get('LOADTEST_POSTGRES_URL'),
+                        help='also benchmark this Postgres database (its tables are dropped)')
+    parser.add_argument('--output', help='write the JSON report here as well')
+    parser.add_argument('--baseline', help='compare against this saved report')
+    parser.add_argument('--save-baseline', help='write the report here as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression vs the baseline (default 0.2)')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, REPO_DIR)
+    if args.command == 'serve':
+        serve(args.port)
+        return
+
+    workspace = tempfile.mkdtemp(prefix='load-bench-')
+    backends = {'sqlite': 'sqlite:///' + os.path.join(workspace, 'load.db')}
+    if args.postgres_url:
+        backends['postgres'] = args.postgres_url
+    try:
+        report = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'settings': {name: getattr(args, name) for name in
+                         ('sizes', 'scenarios', 'concurrency', 'duration', 'server', 'workers', 'threads')},
+            'results': {label: run_backend(label, url, args, workspace) for label, url in backends.items()},
+        }
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Micro-benchmark for listing-page parsing.
+
+    python -m benchmarks.parse_bench page.html error_page_1.html fixtures/sydney
+
+Arguments are saved HTML pages or record/replay fixture directories (their
+HTML responses are used). Each installed parser backend is timed on the
+same pages, next to the previous approach: html.parser, a prettify() debug
+dump and every selector match parsed, nested wrappers included.
+"""
+import argparse
+import json
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+import card_parser
+
+BASE_URL = "https://www.eventbrite.com.au/d/australia--sydney/events/"
+
+
+def load_pages(paths):
+    pages = []
+    for path in paths:
+        manifest_path = os.path.join(path, 'manifest.json')
+        if os.path.isdir(path) and os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                responses = json.load(f).get('responses', {})
+            for entry in responses.values():
+                if entry['headers'].get('Content-Type', '').startswith('text/html'):
+                    with open(os.path.join(path, entry['body']), encoding='utf-8', errors='replace') as f:
+                        pages.append(f.read())
+        else:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+    return pages
+
+
+def legacy_parse(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    soup.prettify()
+    backend = card_parser.SoupBackend('html.parser')
+    return [card_parser.parse_card(backend, div, BASE_URL) for div in soup.select(card_parser.CARD_SELECTOR)]
+
+
+def time_parser(parse, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cards = sum(len(parse(html)) for html in pages)
+        best = min(best, time.perf_counter() - started)
+    return best, cards
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='+', help='HTML files or fixture directories')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per parser; the best one is reported')
+    args = parser.parse_args(argv)
+
+    pages = load_pages(args.pages)
+    if not pages:
+        parser.error('no HTML pages found')
+
+    parsers = [('legacy html.parser', legacy_parse)]
+    for name in card_parser.available_backends():
+        backend = card_parser.get_backend(name)
+        parsers.append((name, lambda html, backend=backend: card_parser.parse_listing(html, BASE_URL, backend, prefer_jsonld=False)))
+
+    print(f"{len(pages)} page(s), {sum(map(len, pages)) / 1024:.0f} KiB, best of {args.repeat}")
+    baseline = None
+    for name, parse in parsers:
+        seconds, cards = time_parser(parse, pages, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:20} {seconds * 1000 / len(pages):9.2f} ms/page {cards:6d} cards {baseline / seconds:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
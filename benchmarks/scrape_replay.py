@@ -0,0 +1,262 @@
+"""Record/replay benchmark for the scraper pipeline.
+
+Record live responses once, then replay the full parse -> fetch -> save
+pipeline offline against a local stand-in server:
+
+    python -m benchmarks.scrape_replay record fixtures/sydney
+    python -m benchmarks.scrape_replay replay fixtures/sydney --repeat 3 --output report.json
+
+Every HTTP request made through ``http_client`` sessions (listing pages,
+images) and every page loaded by the stand-in WebDriver (detail pages and
+the Selenium fallback) is captured into / served from the archive, so
+replay needs neither network access nor Chrome. Runs use a throwaway
+working directory and SQLite database.
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import NoSuchElementException
+
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class Archive:
+    """Directory of recorded responses keyed by URL, described by manifest.json."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        self._lock = threading.Lock()
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except OSError:
+            manifest = {}
+        self.listing_url = manifest.get('listing_url')
+        self.entries = manifest.get('responses', {})
+
+    def add(self, url, status, headers, body):
+        os.makedirs(os.path.join(self.directory, 'bodies'), exist_ok=True)
+        body_name = os.path.join('bodies', hashlib.sha1(url.encode('utf-8')).hexdigest())
+        with open(os.path.join(self.directory, body_name), 'wb') as f:
+            f.write(body)
+        with self._lock:
+            self.entries[url] = {
+                'status': status,
+                'headers': {name: headers[name] for name in KEPT_HEADERS if headers.get(name)},
+                'body': body_name,
+            }
+
+    def get(self, url):
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        with open(os.path.join(self.directory, entry['body']), 'rb') as f:
+            return entry['status'], entry['headers'], f.read()
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'listing_url': self.listing_url, 'responses': self.entries}, f, indent=1, sort_keys=True)
+
+
+def recording_hook(archive):
+    """Session hook that stores every response in ``archive``."""
+    def record(response, *args, **kwargs):
+        if response.status_code != 304:
+            archive.add(response.url, response.status_code, response.headers, response.content)
+        return response
+
+    def install(session):
+        session.hooks['response'].append(record)
+    return install
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter that sends every request to the stand-in server instead."""
+
+    def __init__(self, server_url):
+        super().__init__()
+        self.server_url = server_url
+
+    def send(self, request, **kwargs):
+        request.url = f"{self.server_url}/{quote(request.url, safe='')}"
+        return super().send(request, **kwargs)
+
+
+def replay_hook(server_url):
+    def install(session):
+        adapter = ReplayAdapter(server_url)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    return install
+
+
+def make_server(archive):
+    """Start a local HTTP server answering from ``archive``; returns (server, base_url)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            recorded = archive.get(unquote(self.path[1:]))
+            if recorded is None:
+                self.send_error(404)
+                return
+            status, headers, body = recorded
+            etag = headers.get('ETag')
+            if etag and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class HttpDriver:
+    """Just enough of the WebDriver API for scrape_events, backed by http_client.
+
+    Pages are fetched without running JavaScript, which is what the recorded
+    fixtures contain anyway.
+    """
+
+    def __init__(self):
+        self.page_source = ''
+        self._soup = None
+
+    def get(self, url):
+        from http_client import get_session
+        response = get_session().get(url, timeout=30)
+        self.page_source = response.text
+        self._soup = None
+
+    def _select(self, selector):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.page_source, 'html.parser')
+        return self._soup.select(selector)
+
+    def find_elements(self, by, selector):
+        return self._select(selector)
+
+    def find_element(self, by, selector):
+        found = self._select(selector)
+        if not found:
+            raise NoSuchElementException(selector)
+        return found[0]
+
+    def execute_script(self, script, *args):
+        # A constant scrollHeight ends the scroll loop after one pass
+        return 0
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def save_screenshot(self, path):
+        return True
+
+    def quit(self):
+        pass
+
+
+def prepare_workspace(min_interval):
+    """Point the scraper at a fresh temp directory and database; must run before importing it."""
+    workspace = tempfile.mkdtemp(prefix='scrape-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workspace, 'bench.db')
+    os.environ['EVENTS_VERSION_FILE'] = os.path.join(workspace, 'events.version')
+    os.environ['SCRAPER_SCROLL_PAUSE'] = '0'
+    sys.path.insert(0, os.getcwd())
+    os.chdir(workspace)
+
+    import http_client
+    http_client.rate_limiter.min_interval = min_interval
+
+    from models import db, get_app
+    with get_app().app_context():
+        db.create_all()
+    return workspace
+
+
+def run_once(scrape_events, url):
+    started = time.perf_counter()
+    stats = scrape_events(url=url, driver_factory=HttpDriver) or {}
+    total = time.perf_counter() - started
+    return {
+        'total_seconds': round(total, 4),
+        'listing_path': stats.get('listing_path'),
+        'stages': {stage: round(stats.get(f'{stage}_seconds', 0.0), 4) for stage in ('listing', 'fetch', 'sync')},
+        'stage_timers': stats.get('stages', {}),
+        'cards': stats.get('cards', 0),
+        'events': stats.get('events', 0),
+        'events_per_second': round(stats.get('events', 0) / total, 2) if total else 0.0,
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('mode', choices=('record', 'replay'))
+    parser.add_argument('archive', help='fixture directory')
+    parser.add_argument('--url', help='listing URL (defaults to the scraper\'s)')
+    parser.add_argument('--repeat', type=int, default=1, help='replay runs; later runs exercise the warm caches')
+    parser.add_argument('--output', help='write the JSON report here as well')
+    args = parser.parse_args(argv)
+
+    archive_dir = os.path.abspath(args.archive)
+    output = os.path.abspath(args.output) if args.output else None
+    archive = Archive(archive_dir)
+
+    import http_client
+    if args.mode == 'record':
+        prepare_workspace(min_interval=http_client.HOST_MIN_INTERVAL)
+        http_client.session_hooks.append(recording_hook(archive))
+    else:
+        if not archive.entries:
+            parser.error(f"no recorded responses in {archive_dir}")
+        prepare_workspace(min_interval=0)
+        server, server_url = make_server(archive)
+        http_client.session_hooks.append(replay_hook(server_url))
+
+    import scrape_events
+    url = args.url or archive.listing_url or scrape_events.LISTING_URL
+
+    if args.mode == 'record':
+        result = run_once(scrape_events.scrape_events, url)
+        archive.listing_url = url
+        archive.save()
+        report = {'mode': 'record', 'responses': len(archive.entries), 'run': result}
+    else:
+        runs = [run_once(scrape_events.scrape_events, url) for _ in range(max(1, args.repeat))]
+        server.shutdown()
+        report = {'mode': 'replay', 'responses': len(archive.entries), 'runs': runs}
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
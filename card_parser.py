@@ -0,0 +1,278 @@
+"""HTML parsing for listing cards, JSON-LD events and detail pages.
+
+The extraction rules are written once against a tiny backend interface and
+run on the fastest parser available: selectolax (Lexbor), BeautifulSoup
+with lxml, or BeautifulSoup with the stdlib html.parser. Set
+SCRAPER_PARSER to force one.
+"""
+import json
+import logging
+import os
+import re
+from urllib.parse import parse_qsl, unquote, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+# Listing cards, in order of preference
+CARD_SELECTOR = 'div[class*="event-card"], div[class*="eds-event-card"], div[class*="card"]'
+DETAIL_IMAGE_SELECTOR = 'img[class*="event-image"], img[class*="hero-image"], img'
+JSONLD_EVENT_TYPES = ('Event', 'BusinessEvent', 'MusicEvent', 'SocialEvent', 'EducationEvent')
+BACKGROUND_IMAGE = re.compile(r'background-image:\s*url\(["\']?(.*?)["\']?\)')
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = ('aff', 'ref', 'keep_tld')
+
+
+class SoupBackend:
+    def __init__(self, features):
+        self.name = 'lxml' if features == 'lxml' else 'html.parser'
+        self.features = features
+
+    def parse(self, html):
+        return BeautifulSoup(html, self.features)
+
+    def select(self, node, selector):
+        return node.select(selector)
+
+    def select_one(self, node, selector):
+        return node.select_one(selector)
+
+    def text(self, node):
+        return node.get_text()
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def parent(self, node):
+        return node.parent
+
+    def key(self, node):
+        return id(node)
+
+
+class SelectolaxBackend:
+    name = 'selectolax'
+
+    def parse(self, html):
+        return LexborHTMLParser(html)
+
+    def select(self, node, selector):
+        found = node.css(selector)
+        if ',' not in selector or len(found) < 2:
+            return found
+        # Lexbor returns selector groups one after the other and may repeat a
+        # node; restore soupsieve's unique, document-order result
+        unique = {match.mem_id: match for match in found}
+        start = node.root if isinstance(node, LexborHTMLParser) else node
+        return [unique[n.mem_id] for n in start.traverse() if n.mem_id in unique]
+
+    def select_one(self, node, selector):
+        if ',' not in selector:
+            return node.css_first(selector)
+        found = self.select(node, selector)
+        return found[0] if found else None
+
+    def text(self, node):
+        return node.text()
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+    def parent(self, node):
+        return node.parent
+
+    def key(self, node):
+        return node.mem_id
+
+
+def available_backends():
+    names = []
+    if LexborHTMLParser is not None:
+        names.append('selectolax')
+    if HAVE_LXML:
+        names.append('lxml')
+    names.append('html.parser')
+    return names
+
+
+def get_backend(name=None):
+    """Return the named parser backend, or the fastest installed one for 'auto'/None."""
+    name = name or os.environ.get('SCRAPER_PARSER', 'auto')
+    if name == 'auto':
+        name = available_backends()[0]
+    if name == 'selectolax' and LexborHTMLParser is not None:
+        return SelectolaxBackend()
+    if name == 'lxml' and HAVE_LXML:
+        return SoupBackend('lxml')
+    if name != 'html.parser':
+        logging.warning(f"Parser backend {name!r} is not available, using html.parser")
+    return SoupBackend('html.parser')
+
+
+def _image_from_img(backend, img_elem, base_url):
+    src = backend.attr(img_elem, 'src')
+    if src and not src.startswith('data:'):
+        return urljoin(base_url, src)
+    src_lazy = backend.attr(img_elem, 'data-src') or backend.attr(img_elem, 'data-lazy')
+    if src_lazy:
+        return urljoin(base_url, src_lazy)
+    return None
+
+
+def parse_card(backend, event_div, base_url):
+    """Extract the fields of one listing card without touching the network."""
+    def first_text(selector, limit):
+        elem = backend.select_one(event_div, selector)
+        return backend.text(elem).strip()[:limit] if elem is not None else None
+
+    name = first_text('h2, h3, [class*="title"]', 80) or "Untitled Event"
+    date = first_text('time, [class*="date"], [class*="time"]', 120) or "No date available"
+    description = first_text('[class*="description"], [class*="summary"], p:not([class*="availability"])', 200) or name
+    location = first_text('[class*="location"], [class*="venue"], [class*="city"]', 100) or ""
+
+    url_elem = backend.select_one(event_div, 'a[href]')
+    href = backend.attr(url_elem, 'href') if url_elem is not None else None
+    event_url = urljoin(base_url, href)[:200] if href else base_url
+
+    image_url = None
+    img_elem = backend.select_one(event_div, 'img[class*="event-card__image"], img[class*="card-image"], img')
+    if img_elem is not None:
+        image_url = _image_from_img(backend, img_elem, base_url)
+
+    if not image_url:
+        img_container = backend.select_one(event_div, '[style*="background-image"]')
+        if img_container is not None:
+            match = BACKGROUND_IMAGE.search(backend.attr(img_container, 'style') or '')
+            if match:
+                image_url = urljoin(base_url, match.group(1))
+
+    if image_url and 'img.evbuc.com/https' in image_url:
+        try:
+            image_url = unquote(image_url.split('img.evbuc.com/')[1])
+        except Exception as e:
+            logging.warning(f"Failed to decode image URL: {e}")
+
+    return {
+        'name': name,
+        'date': date,
+        'description': description,
+        'location': location,
+        'url': event_url,
+        'image_url': image_url,
+    }
+
+
+def canonical_url(url):
+    """Drop the fragment and tracking parameters so one event has one URL."""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in TRACKING_PARAMS and not key.startswith('utm_')]
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+
+def find_cards(backend, root, base_url=''):
+    """Return the outermost element of each event card, in document order.
+
+    ``CARD_SELECTOR`` also matches wrappers nested inside a card (image boxes,
+    detail panes) and containers around many cards. A match counts as a card
+    when it links to at most one distinct event URL (after resolving against
+    ``base_url`` and ``canonical_url``, so ``/e/2`` and ``/e/2?aff=x`` are
+    one link); matches inside an accepted card are skipped, so each event is
+    parsed once.
+    """
+    cards = []
+    accepted = set()
+    for elem in backend.select(root, CARD_SELECTOR):
+        node, inside = backend.parent(elem), False
+        while node is not None:
+            if backend.key(node) in accepted:
+                inside = True
+                break
+            node = backend.parent(node)
+        if inside:
+            continue
+        hrefs = {canonical_url(urljoin(base_url, backend.attr(a, 'href'))) for a in backend.select(elem, 'a[href]')}
+        if len(hrefs) > 1:
+            continue
+        accepted.add(backend.key(elem))
+        cards.append(elem)
+    return cards
+
+
+def extract_jsonld_cards(backend, root, base_url):
+    """Return card records for any schema.org Event objects embedded as JSON-LD."""
+    cards = []
+    for script in backend.select(root, 'script[type="application/ld+json"]'):
+        try:
+            data = json.loads(backend.text(script) or '')
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else [data]
+        while items:
+            item = items.pop(0)
+            if not isinstance(item, dict):
+                continue
+            if item.get('@type') == 'ItemList':
+                items.extend(entry.get('item', entry) for entry in item.get('itemListElement', []) if isinstance(entry, dict))
+                continue
+            if item.get('@type') not in JSONLD_EVENT_TYPES:
+                continue
+            location = item.get('location') or {}
+            if isinstance(location, dict):
+                address = location.get('address') or {}
+                if isinstance(address, dict):
+                    address = ' '.join(v for k, v in address.items() if isinstance(v, str) and not k.startswith('@'))
+                location = f"{location.get('name', '')} {address}".strip()
+            image = item.get('image')
+            if isinstance(image, list):
+                image = image[0] if image else None
+            if isinstance(image, dict):
+                image = image.get('url')
+            name = str(item.get('name') or "Untitled Event").strip()[:80]
+            cards.append({
+                'name': name,
+                'date': str(item.get('startDate') or "No date available")[:120],
+                'description': str(item.get('description') or name).strip()[:200],
+                'location': str(location)[:100],
+                'url': urljoin(base_url, item['url'])[:200] if item.get('url') else base_url,
+                'image_url': urljoin(base_url, image) if image else None,
+            })
+    return cards
+
+
+def parse_listing(html, base_url, backend=None, prefer_jsonld=True):
+    """Parse a listing page once and return its card records.
+
+    Embedded JSON-LD events are used when present (and ``prefer_jsonld``),
+    otherwise the card markup.
+    """
+    backend = backend or get_backend()
+    root = backend.parse(html)
+    if prefer_jsonld:
+        cards = extract_jsonld_cards(backend, root, base_url)
+        if cards:
+            return cards
+    cards = []
+    for event_div in find_cards(backend, root, base_url):
+        try:
+            cards.append(parse_card(backend, event_div, base_url))
+        except Exception as e:
+            logging.warning(f"Error parsing event: {e}")
+    return cards
+
+
+def parse_detail_image(html, page_url, backend=None):
+    """Return the hero image URL of an event detail page, or None."""
+    backend = backend or get_backend()
+    detail_img = backend.select_one(backend.parse(html), DETAIL_IMAGE_SELECTOR)
+    return _image_from_img(backend, detail_img, page_url) if detail_img is not None else None
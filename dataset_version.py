@@ -0,0 +1,36 @@
+import os
+import time
+import uuid
+
+# The scraper rewrites this file after every sync that changed the Event
+# table; web workers compare its contents to decide whether cached event
+# payloads are stale. Reading it is a stat() plus a tiny read, no DB access.
+VERSION_FILE = os.environ.get('EVENTS_VERSION_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'events.version'))
+
+# Used when no scraper has written a version yet, so caches still expire
+FALLBACK_TTL = 60
+
+_cached = {'mtime': None, 'version': None}
+
+
+def current_version():
+    """Return an opaque token that changes whenever the event data changes."""
+    try:
+        mtime = os.stat(VERSION_FILE).st_mtime_ns
+    except OSError:
+        return f"ttl-{int(time.time() // FALLBACK_TTL)}"
+    if _cached['mtime'] != mtime:
+        with open(VERSION_FILE, encoding='utf-8') as f:
+            _cached['version'] = f.read().strip()
+        _cached['mtime'] = mtime
+    return _cached['version']
+
+
+def bump_version():
+    """Publish a new dataset version; call after committing changes to events."""
+    version = uuid.uuid4().hex[:16]
+    tmp_path = VERSION_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_path, VERSION_FILE)
+    return version
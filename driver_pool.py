@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+
+class DriverPool:
+    """A bounded pool of warm WebDriver instances.
+
+    Drivers are created lazily by ``factory`` up to ``size`` and handed out
+    with ``lease()``. A driver is recycled after ``max_pages`` leases or as
+    soon as a lease raises a WebDriverException, so a crashed Chrome is never
+    handed out twice.
+    """
+
+    def __init__(self, factory, size=2, max_pages=25):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self._idle = []
+        self._pages = {}
+        self._broken = set()
+        self._created = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.lease_timings = []
+        self.drivers_started = 0
+        self.drivers_recycled = 0
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                self._cond.wait()
+
+        # Start Chrome outside the lock so other leases are not blocked on it
+        driver = self.factory()
+        if driver is None:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            return None
+        with self._cond:
+            self._pages[id(driver)] = 0
+            self.drivers_started += 1
+        return driver
+
+    def invalidate(self, driver):
+        """Mark a leased driver as unusable so it is quit instead of reused."""
+        with self._cond:
+            self._broken.add(id(driver))
+
+    def _release(self, driver, broken=False):
+        with self._cond:
+            broken = broken or id(driver) in self._broken
+            self._broken.discard(id(driver))
+            pages = self._pages.get(id(driver), 0) + 1
+            recycle = broken or self._closed or pages >= self.max_pages
+            if recycle:
+                self._pages.pop(id(driver), None)
+                self._created -= 1
+                self.drivers_recycled += 1
+            else:
+                self._pages[id(driver)] = pages
+                self._idle.append(driver)
+            self._cond.notify()
+        if recycle:
+            self._quit(driver)
+            logging.info(f"Recycled WebDriver after {pages} page(s){' (crashed)' if broken else ''}.")
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error closing WebDriver: {e}")
+
+    @contextmanager
+    def lease(self, label=""):
+        """Lease a driver for one page fetch. Yields None if Chrome failed to start."""
+        requested = time.perf_counter()
+        driver = self._acquire()
+        acquired = time.perf_counter()
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            released = time.perf_counter()
+            if driver is not None:
+                broken = broken or id(driver) in self._broken
+                self._release(driver, broken=broken)
+            timing = {
+                'label': label,
+                'wait': acquired - requested,
+                'held': released - acquired,
+                'broken': broken,
+            }
+            self.lease_timings.append(timing)
+            logging.debug("Driver lease %s: waited %.2fs, held %.2fs", label or '-', timing['wait'], timing['held'])
+
+    def stats(self):
+        """Return a summary of the pool's activity for logging."""
+        waits = [t['wait'] for t in self.lease_timings]
+        held = [t['held'] for t in self.lease_timings]
+        return {
+            'leases': len(self.lease_timings),
+            'drivers_started': self.drivers_started,
+            'drivers_recycled': self.drivers_recycled,
+            'total_wait': sum(waits),
+            'total_held': sum(held),
+            'max_wait': max(waits, default=0.0),
+        }
+
+    def close(self):
+        """Quit every idle driver; leased drivers are quit when returned."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for driver in idle:
+            self._pages.pop(id(driver), None)
+            self._quit(driver)
+        logging.info(f"DriverPool closed: {self.stats()}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
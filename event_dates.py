@@ -0,0 +1,76 @@
+import re
+from datetime import datetime, timedelta
+
+# Listing cards show dates like "Sat, Jun 7 • 7:00 PM", "Tomorrow at 6pm",
+# "Wednesday at 7:00 PM" or "7 June 2025, 10:00am"; JSON-LD gives ISO 8601. Everything is stored as a
+# naive datetime in the event's local time.
+_WEEKDAY = re.compile(r'\b(mon|tue|wed|thu|fri|sat|sun)[a-z]*\b,?', re.IGNORECASE)
+_TIME = re.compile(r'\b(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)', re.IGNORECASE)
+_WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+_WEEKDAY_NAME = re.compile(r'\b(mon|tue|wed|thu|fri|sat|sun)(?:day|s|sday|nesday|rsday|urday|r|rs)?\b', re.IGNORECASE)
+_MONTHS = {name: index for index, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+_MONTH_DAY = re.compile(r'\b([a-z]{3})[a-z]*\.?\s+(\d{1,2})(?:st|nd|rd|th)?\b(?:,?\s+(\d{4}))?', re.IGNORECASE)
+_DAY_MONTH = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]{3})[a-z]*\.?\b(?:,?\s+(\d{4}))?', re.IGNORECASE)
+
+
+def parse_event_date(text, now=None):
+    """Best-effort conversion of a scraped date string to a datetime, or None.
+
+    Relative dates ("Tomorrow", a bare weekday) resolve against ``now``, the
+    scrape time; a bare weekday means its next occurrence, today included
+    while the start time is still ahead.
+    """
+    if not text:
+        return None
+    text = text.strip()
+    now = now or datetime.now()
+
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        pass
+
+    # Only the first date of a range or "+ 3 more" series matters
+    text = re.split(r'\s[-–]\s|\+\s*\d+\s+more', text)[0]
+
+    hour = minute = 0
+    time_match = _TIME.search(text)
+    if time_match:
+        hour = int(time_match.group(1)) % 12
+        minute = int(time_match.group(2) or 0)
+        if time_match.group(3).lower().startswith('p'):
+            hour += 12
+        text = text[:time_match.start()] + text[time_match.end():]
+
+    lowered = text.lower()
+    if 'today' in lowered or 'tonight' in lowered:
+        day = now.date()
+    elif 'tomorrow' in lowered:
+        day = now.date() + timedelta(days=1)
+    else:
+        weekday = _WEEKDAY_NAME.search(text)
+        text = _WEEKDAY.sub(' ', text)
+        day = None
+        for pattern, month_group, day_group in ((_MONTH_DAY, 1, 2), (_DAY_MONTH, 2, 1)):
+            match = pattern.search(text)
+            if match and match.group(month_group)[:3].lower() in _MONTHS:
+                month = _MONTHS[match.group(month_group)[:3].lower()]
+                year = int(match.group(3)) if match.group(3) else now.year
+                try:
+                    day = datetime(year, month, int(match.group(day_group))).date()
+                except ValueError:
+                    return None
+                # Cards omit the year; a date well in the past means next year
+                if not match.group(3) and day < now.date() - timedelta(days=60):
+                    day = day.replace(year=year + 1)
+                break
+        if day is None and weekday:
+            days_ahead = (_WEEKDAYS.index(weekday.group(1).lower()) - now.weekday()) % 7
+            if not days_ahead and time_match and (hour, minute) < (now.hour, now.minute):
+                days_ahead = 7
+            day = now.date() + timedelta(days=days_ahead)
+        if day is None:
+            return None
+
+    return datetime(day.year, day.month, day.day, hour, minute)
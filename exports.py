@@ -0,0 +1,156 @@
+"""Streaming bulk exports of events and ticket requests.
+
+Rows are read in ``yield_per`` batches from a server-side cursor
+(``stream_results``; a named cursor on Postgres), as plain column tuples
+rather than ORM objects, so memory use stays flat however large the table
+is. Formats: NDJSON, CSV and, when pyarrow is installed, Parquet (one row
+group per batch).
+
+Incremental exports: ``since_id`` returns rows with a larger id, ``since``
+rows changed (events) or created (ticket requests) at or after a
+timestamp. Rows always come in id order, so the last id of one export is
+the ``since_id`` of the next.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from models import Event, TicketRequest, db
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_BATCH_SIZE = 1000
+
+# Dataset -> model, exported columns and the column ``since`` filters on.
+# TicketRequest.otp is deliberately left out.
+DATASETS = {
+    'events': (Event, ('id', 'name', 'date', 'starts_at', 'description', 'url', 'image_url', 'city', 'source',
+                       'fingerprint', 'last_seen_at', 'last_changed_at'), 'last_changed_at'),
+    'ticket-requests': (TicketRequest, ('id', 'request_key', 'email', 'event_url', 'dob', 'verified', 'created_at'),
+                        'created_at'),
+}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    # Flask appends the charset to text/* mimetypes
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def export_columns(dataset):
+    return DATASETS[dataset][1]
+
+
+def iter_rows(dataset, since_id=None, since=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of up to ``batch_size`` row tuples of ``dataset``, in id order.
+
+    Must be called inside an app context, which must stay open until the
+    generator is exhausted.
+    """
+    model, columns, since_column = DATASETS[dataset]
+    statement = select(*(getattr(model, column) for column in columns)).order_by(model.id)
+    if since_id is not None:
+        statement = statement.where(model.id > since_id)
+    if since is not None:
+        statement = statement.where(getattr(model, since_column) >= since)
+    result = db.session.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def ndjson_chunks(dataset, batches):
+    columns = export_columns(dataset)
+    for batch in batches:
+        yield ''.join(json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) + '\n' for row in batch)
+
+
+def csv_chunks(dataset, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_columns(dataset))
+    for batch in batches:
+        writer.writerows([_plain(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink that hands back whatever was written since the last ``take()``."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(dataset):
+    model, columns, _ = DATASETS[dataset]
+    types = {int: pyarrow.int64(), str: pyarrow.string(), bool: pyarrow.bool_(),
+             datetime: pyarrow.timestamp('us'), date: pyarrow.date32()}
+    return pyarrow.schema([(column, types[model.__table__.c[column].type.python_type]) for column in columns])
+
+
+def parquet_chunks(dataset, batches):
+    columns = export_columns(dataset)
+    schema = _arrow_schema(dataset)
+    sink = _Drain()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    for batch in batches:
+        writer.write_table(pyarrow.Table.from_pydict(
+            {column: [row[index] for row in batch] for index, column in enumerate(columns)}, schema=schema))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+CHUNKERS = {'ndjson': ndjson_chunks, 'csv': csv_chunks, 'parquet': parquet_chunks}
+
+
+def export_chunks(dataset, fmt, since_id=None, since=None, batch_size=EXPORT_BATCH_SIZE):
+    """Chunks (str, or bytes for Parquet) of ``dataset`` serialized as ``fmt``, one per batch."""
+    if dataset not in DATASETS:
+        raise ExportError(f"Unknown dataset {dataset!r}; expected one of {', '.join(DATASETS)}")
+    if fmt not in CHUNKERS:
+        raise ExportError(f"Unknown format {fmt!r}; expected one of {', '.join(CHUNKERS)}")
+    if fmt == 'parquet' and pyarrow is None:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+    return CHUNKERS[fmt](dataset, iter_rows(dataset, since_id, since, batch_size))
@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36'
+
+# Minimum gap between two requests to the same host, in seconds
+HOST_MIN_INTERVAL = float(os.environ.get('SCRAPER_HOST_MIN_INTERVAL', 0.25))
+
+_local = threading.local()
+
+# Callables applied to every new session, e.g. to mount a recording or replay adapter
+session_hooks = []
+
+
+def get_session():
+    """Return a keep-alive requests session for the calling thread."""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = USER_AGENT
+        for hook in session_hooks:
+            hook(session)
+        _local.session = session
+    return session
+
+
+def reset_session():
+    """Drop this thread's session, e.g. in a forked worker, so it never shares sockets with its parent."""
+    _local.session = None
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host across threads."""
+
+    def __init__(self, min_interval=HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if self.min_interval <= 0:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+rate_limiter = HostRateLimiter()
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from http_client import get_session, rate_limiter
+
+INDEX_FILE = 'index.json'
+CONTENT_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+    'image/avif': 'avif',
+}
+
+
+class ImageStore:
+    """Content-addressed cache of downloaded event images.
+
+    Files are named after the SHA-256 of their bytes, so the same image is
+    stored once however many events or URLs point at it. ``index.json`` maps
+    each source URL to its file plus the ETag/Last-Modified validators, which
+    are sent back on the next run so unchanged images cost a 304.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def public_path(self, file_name):
+        return f"/{self.directory}/{file_name}".replace(os.sep, '/')
+
+    def fetch(self, image_url):
+        """Return the public path of ``image_url``, downloading it only if it changed."""
+        with self._lock:
+            entry = dict(self.index.get(image_url) or {})
+        headers = {}
+        if entry and os.path.exists(os.path.join(self.directory, entry['file'])):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        else:
+            entry = {}
+
+        rate_limiter.wait(image_url)
+        with get_session().get(image_url, headers=headers, stream=True, timeout=10) as response:
+            if response.status_code == 304 and entry:
+                entry['checked_at'] = time.time()
+                with self._lock:
+                    self.index[image_url] = entry
+                logging.info(f"Image unchanged, reusing {entry['file']}")
+                return self.public_path(entry['file'])
+            if response.status_code != 200:
+                logging.warning(f"Failed to download image {image_url}: HTTP {response.status_code}")
+                return None
+
+            digest = hashlib.sha256()
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in response.iter_content(64 * 1024):
+                        digest.update(chunk)
+                        f.write(chunk)
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+                extension = CONTENT_EXTENSIONS.get(content_type) or self._url_extension(image_url)
+                file_name = f"{digest.hexdigest()[:32]}.{extension}"
+                file_path = os.path.join(self.directory, file_name)
+                if os.path.exists(file_path):
+                    os.remove(tmp_path)
+                    logging.info(f"Image content already stored as {file_name}")
+                else:
+                    os.replace(tmp_path, file_path)
+                    logging.info(f"Stored new image {file_name}")
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            with self._lock:
+                self.index[image_url] = {
+                    'file': file_name,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'checked_at': time.time(),
+                }
+        return self.public_path(file_name)
+
+    @staticmethod
+    def _url_extension(image_url):
+        extension = image_url.split('?')[0].rsplit('.', 1)[-1].lower()
+        return extension if extension.isalnum() and len(extension) <= 4 else 'jpg'
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.index)
+
+    def changes_since(self, snapshot):
+        """Index entries added or updated since ``snapshot()``, for handing back from a worker process."""
+        with self._lock:
+            return {url: entry for url, entry in self.index.items() if snapshot.get(url) != entry}
+
+    def merge(self, entries):
+        """Adopt index entries fetched by another process; the files are already on disk."""
+        with self._lock:
+            self.index.update(entries)
+
+    def save(self):
+        """Atomically write the URL index back to disk."""
+        with self._lock:
+            data = json.dumps(self.index, indent=1, sort_keys=True)
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.index_path)
+
+    def collect_garbage(self, referenced_paths):
+        """Delete stored files that no event references any more.
+
+        ``referenced_paths`` are public paths as stored in ``Event.image_url``.
+        Index entries pointing at removed files are dropped too. Returns the
+        number of files removed.
+        """
+        referenced = {os.path.basename(path) for path in referenced_paths if path}
+        removed = 0
+        for file_name in os.listdir(self.directory):
+            file_path = os.path.join(self.directory, file_name)
+            if file_name in referenced or file_name == INDEX_FILE or not os.path.isfile(file_path):
+                continue
+            os.remove(file_path)
+            removed += 1
+        with self._lock:
+            self.index = {url: entry for url, entry in self.index.items() if entry['file'] in referenced}
+        self.save()
+        logging.info(f"Image garbage collection removed {removed} orphaned file(s).")
+        return removed
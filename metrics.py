@@ -0,0 +1,173 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+A small dependency-free subset of prometheus_client (histograms and samples
+computed at scrape time) plus a stage timer for the scraper. Every worker
+process keeps its own values; scrape each worker's /metrics, or aggregate in
+Prometheus.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Written by the scraper at the end of every run and exposed by the web app's /metrics
+SCRAPE_SUMMARY_FILE = os.environ.get('SCRAPER_METRICS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrape_metrics.json'))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    pairs = ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS, registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, dict(series, counts=list(series['counts']))) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_text(key + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(key)} {_number(series['sum'])}")
+            lines.append(f"{self.name}_count{_label_text(key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        # Extra exposition lines computed at scrape time, e.g. pool stats
+        self.collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def expose(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def sample_lines(name, documentation, kind, samples):
+    """Exposition lines for a counter or gauge read at scrape time; ``samples`` maps label tuples to values."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_label_text(key)} {_number(value)}" for key, value in sorted(samples.items()))
+    return lines
+
+
+class StageTimer:
+    """Accumulates wall time per named stage of a run, across threads."""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            entry = self._stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+
+    def summary(self):
+        with self._lock:
+            return {stage: {'count': entry['count'], 'seconds': round(entry['seconds'], 4),
+                            'max_seconds': round(entry['max_seconds'], 4)}
+                    for stage, entry in self._stages.items()}
+
+    def merge(self, summary):
+        """Add another timer's ``summary()``, e.g. one from a worker process."""
+        with self._lock:
+            for stage, other in summary.items():
+                entry = self._stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+                entry['count'] += other['count']
+                entry['seconds'] += other['seconds']
+                entry['max_seconds'] = max(entry['max_seconds'], other['max_seconds'])
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+def write_summary(path, summary):
+    """Atomically replace ``path`` with ``summary`` as JSON."""
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+_summary_cache = {'mtime': None, 'data': None}
+
+
+def read_summary(path):
+    """Return the JSON summary at ``path``, re-reading it only when the file changed."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if _summary_cache['mtime'] != mtime:
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        _summary_cache.update(mtime=mtime, data=data)
+    return _summary_cache['data']
@@ -0,0 +1,51 @@
+"""Event start time, url/date indexes and full-text search
+
+Revision ID: a3c5d9e1f2b4
+Revises: 077ab2da180f
+Create Date: 2026-10-17 10:12:41.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from search_index import create_fts_triggers, drop_fts_triggers
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c5d9e1f2b4'
+down_revision = '077ab2da180f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('starts_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_event_starts_at'), ['starts_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_event_url'), ['url'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # External-content FTS5 table kept in sync with event by triggers
+        op.execute("CREATE VIRTUAL TABLE event_fts USING fts5(name, description, content='event', content_rowid='id')")
+        create_fts_triggers(op, rebuild=True)
+    elif dialect == 'postgresql':
+        # Must match the expression used by event_search_filter() in app.py
+        op.execute(
+            "CREATE INDEX ix_event_search ON event USING gin "
+            "(to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '')))"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        drop_fts_triggers(op)
+        op.execute("DROP TABLE IF EXISTS event_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_event_search")
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_event_url'))
+        batch_op.drop_index(batch_op.f('ix_event_starts_at'))
+        batch_op.drop_column('starts_at')
@@ -0,0 +1,236 @@
+"""Database models shared by the web app, the scraper and the scheduler.
+
+Importing this module has no side effects: it does not build a Flask app,
+configure logging or open a connection. The web app binds ``db`` with
+``configure_db(app)``; scripts call ``get_app()``, which builds a minimal
+app (no routes, templates or page cache) the first time it is needed.
+"""
+import os
+import threading
+import time
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError, ProgrammingError, TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql import text
+
+from thumbnails import THUMB_WIDTHS, thumbnail_urls
+
+db = SQLAlchemy()
+
+
+def database_uri():
+    uri = os.environ.get('DATABASE_URL', 'sqlite:///' + os.path.join(os.path.dirname(__file__), 'events.db'))
+    if uri.startswith('postgres://'):
+        uri = uri.replace('postgres://', 'postgresql://', 1) + '?sslmode=require'
+    return uri
+
+
+class PoolStats:
+    """Running totals of how long callers waited to check out a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds': round(self.wait_seconds, 6),
+                'max_wait_seconds': round(self.max_wait_seconds, 6),
+                'avg_wait_seconds': round(self.wait_seconds / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that records checkout wait times in ``self.stats``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeout:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+
+def engine_options(uri, profile):
+    """SQLAlchemy engine options for the 'tuned' profile; 'default' leaves SQLAlchemy's own."""
+    if profile == 'default':
+        return {}
+    if uri.startswith('sqlite'):
+        if ':memory:' in uri or uri in ('sqlite://', 'sqlite:///'):
+            return {}
+        # Several readers plus the scraper's writer; busy_timeout (below) handles lock waits
+        return {
+            'poolclass': MonitoredQueuePool,
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+            'connect_args': {'timeout': int(os.environ.get('DB_SQLITE_BUSY_TIMEOUT', 5000)) / 1000},
+        }
+    return {
+        'poolclass': MonitoredQueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        # Drop connections idle servers or proxies may have closed
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+        'pool_use_lifo': True,
+    }
+
+
+def sqlite_pragmas():
+    return {
+        # Readers never block on the scraper's write transaction, and vice versa
+        'journal_mode': 'WAL',
+        # Safe with WAL: a power loss can only drop the last commits, never corrupt
+        'synchronous': 'NORMAL',
+        'mmap_size': int(os.environ.get('DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'busy_timeout': int(os.environ.get('DB_SQLITE_BUSY_TIMEOUT', 5000)),
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def configure_db(flask_app):
+    """Bind ``db`` to ``flask_app``. SQLAlchemy connects on first query, not here.
+
+    ``DB_PROFILE`` (config or environment) picks the engine settings:
+    'tuned' (default) or 'default' for SQLAlchemy's own.
+    """
+    uri = flask_app.config.setdefault('SQLALCHEMY_DATABASE_URI', database_uri())
+    profile = flask_app.config.setdefault('DB_PROFILE', os.environ.get('DB_PROFILE', 'tuned'))
+    flask_app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    flask_app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(uri, profile))
+    db.init_app(flask_app)
+    if profile != 'default' and uri.startswith('sqlite'):
+        with flask_app.app_context():
+            event.listen(db.engine, 'connect', _apply_sqlite_pragmas)
+    return flask_app
+
+
+def pool_stats():
+    """Checkout wait totals and current pool status for the engine of the current app."""
+    pool = db.engine.pool
+    stats = pool.stats.snapshot() if isinstance(pool, MonitoredQueuePool) else {}
+    stats['status'] = pool.status()
+    return stats
+
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_app():
+    """Return a minimal Flask app for database access outside the web process."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = configure_db(Flask(__name__))
+    return _app
+
+
+def migration_revision():
+    """Return the applied Alembic revision, or None if migrations were never run.
+
+    Must be called inside an app context. Raises OperationalError when the
+    database itself is unreachable.
+    """
+    try:
+        return db.session.execute(text('SELECT version_num FROM alembic_version')).scalar()
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        # Distinguish "no alembic_version table" from "no database"
+        db.session.execute(text('SELECT 1'))
+        return None
+
+
+class Event(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), nullable=False)
+    date = db.Column(db.String(120), nullable=False)
+    description = db.Column(db.String(200), nullable=False)
+    url = db.Column(db.String(200), nullable=False, index=True)
+    image_url = db.Column(db.String(200), nullable=True)
+    # Parsed from the free-text ``date`` by the scraper; None when unparseable
+    starts_at = db.Column(db.DateTime, nullable=True, index=True)
+    # Hash of the listing card (name, date, description, image URL) from the last scrape
+    fingerprint = db.Column(db.String(64), nullable=True)
+    last_seen_at = db.Column(db.DateTime, nullable=True)
+    last_changed_at = db.Column(db.DateTime, nullable=True, index=True)
+    # Listing source (a name in sources.SOURCES) and its city
+    city = db.Column(db.String(40), nullable=True, index=True)
+    source = db.Column(db.String(40), nullable=True)
+
+    @property
+    def display_image_url(self):
+        thumbs = thumbnail_urls(self.image_url)
+        if thumbs:
+            return thumbs[min(thumbs)]
+        return self.image_url or f"https://picsum.photos/200/300?random={self.id}"
+
+    @property
+    def display_image_srcset(self):
+        thumbs = thumbnail_urls(self.image_url)
+        return ", ".join(f"{url} {width // THUMB_WIDTHS[0]}x" for width, url in sorted(thumbs.items()))
+
+
+class TicketRequest(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    # Generated at submission so a request can be referenced before its batch is committed
+    request_key = db.Column(db.String(32), nullable=True, unique=True)
+    email = db.Column(db.String(120), nullable=False)
+    event_url = db.Column(db.String(200), nullable=False)
+    dob = db.Column(db.Date, nullable=False)
+    otp = db.Column(db.String(6), nullable=True)
+    verified = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, nullable=True, index=True)
+
+
+class ScrapeRun(db.Model):
+    """One scheduled or manual scraper run, written by scrape_scheduler."""
+    id = db.Column(db.Integer, primary_key=True)
+    mode = db.Column(db.String(10), nullable=False)
+    status = db.Column(db.String(10), nullable=False)  # running, success, failed, timeout, skipped
+    started_at = db.Column(db.DateTime, nullable=False, index=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_seconds = db.Column(db.Float, nullable=True)
+    listing_path = db.Column(db.String(10), nullable=True)
+    cards = db.Column(db.Integer, nullable=True)
+    events = db.Column(db.Integer, nullable=True)
+    inserted = db.Column(db.Integer, nullable=True)
+    updated = db.Column(db.Integer, nullable=True)
+    deleted = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
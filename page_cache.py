@@ -0,0 +1,103 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries=32, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FileSystemCache:
+    """Text cache on local disk, shared by every worker process on the host.
+
+    A small MemoryCache sits in front of it so a worker only reads the file
+    the first time it sees a key.
+    """
+
+    def __init__(self, directory, ttl=3600):
+        self.directory = directory
+        self.ttl = ttl
+        self._memory = MemoryCache(ttl=ttl)
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.html')
+
+    def get(self, key):
+        value = self._memory.get(key)
+        if value is not None:
+            return value
+        path = self._path(key)
+        try:
+            if os.stat(path).st_mtime + self.ttl < time.time():
+                return None
+            with open(path, encoding='utf-8') as f:
+                value = f.read()
+        except OSError:
+            return None
+        self._memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self._memory.set(key, value)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+        self._prune()
+
+    def _prune(self):
+        """Drop expired entries; keys embed the dataset version, so old ones are never read again."""
+        cutoff = time.time() - self.ttl
+        for file_name in os.listdir(self.directory):
+            path = os.path.join(self.directory, file_name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        self._memory.clear()
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.html'):
+                os.remove(os.path.join(self.directory, file_name))
+
+
+def create_cache(backend='memory', directory=None, ttl=3600, max_entries=32):
+    """Build the page cache selected by configuration ('memory' or 'filesystem')."""
+    if backend == 'filesystem':
+        return FileSystemCache(directory or os.path.join(tempfile.gettempdir(), 'events-page-cache'), ttl=ttl)
+    return MemoryCache(max_entries=max_entries, ttl=ttl)
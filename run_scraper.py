@@ -1,7 +1,6 @@
 # run_scraper.py
-from apscheduler.schedulers.blocking import BlockingScheduler # type: ignore
-from scrape_events import scrape_events
+import logging
+from scrape_scheduler import run_blocking
 
-scheduler = BlockingScheduler()
-scheduler.add_job(scrape_events, 'interval', hours=24)  # Run daily
-scheduler.start()
\ No newline at end of file
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+run_blocking()
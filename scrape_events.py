@@ -1,59 +1,87 @@
-import requests
-import re
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from app import Event, db, app
-from urllib.parse import urljoin, unquote
+from models import Event, db, get_app
+from card_parser import CARD_SELECTOR, DETAIL_IMAGE_SELECTOR, canonical_url, parse_detail_image, parse_listing
+from driver_pool import DriverPool
+from dataset_version import bump_version
+from event_dates import parse_event_date
+from http_client import get_session, rate_limiter, reset_session
+from image_store import ImageStore
+from metrics import SCRAPE_SUMMARY_FILE, StageTimer, write_summary
+from sources import DEFAULT_SOURCE, SOURCES, enabled_sources
+from thumbnails import IMAGE_DIR, generate_thumbnails
+import thumbnails
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlsplit
+import argparse
+import sys
+import hashlib
+import json
 import logging
+import multiprocessing
 import time
 import os
-import uuid  # For generating unique file names
+from datetime import datetime
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 
 # Configure logging
 logging.basicConfig(filename='scraper.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Directory to store images
-IMAGE_DIR = os.path.join("static", "images")
-if not os.path.exists(IMAGE_DIR):
-    os.makedirs(IMAGE_DIR)
+# Directory to store images (shared with the thumbnail pipeline)
+image_store = ImageStore(IMAGE_DIR)
+
+# Warm Chrome instances shared by the listing and detail-page fetches
+DRIVER_POOL_SIZE = int(os.environ.get('SCRAPER_DRIVER_POOL_SIZE', 2))
+DRIVER_MAX_PAGES = int(os.environ.get('SCRAPER_DRIVER_MAX_PAGES', 25))
+
+LISTING_URL = SOURCES[DEFAULT_SOURCE]['url']
+
+# Sources are collected in parallel by up to this many worker processes
+SOURCE_PROCESSES = int(os.environ.get('SCRAPER_SOURCE_PROCESSES', 4))
+
+# Seconds to wait for new cards after each scroll of the Selenium listing
+SCROLL_PAUSE = float(os.environ.get('SCRAPER_SCROLL_PAUSE', 2))
+
+# Write the rendered listing to page.html for debugging selectors
+DEBUG_DUMP = os.environ.get('SCRAPER_DEBUG_DUMP', '').lower() in ('1', 'true', 'yes')
+
+# The HTTP fast path must find at least this many cards or Selenium is used instead
+HTTP_MIN_CARDS = int(os.environ.get('SCRAPER_HTTP_MIN_CARDS', 10))
+HTTP_MAX_PAGES = int(os.environ.get('SCRAPER_HTTP_MAX_PAGES', 10))
+
+# Delta scrapes only look at the newest listing pages
+DELTA_MAX_PAGES = int(os.environ.get('SCRAPER_DELTA_MAX_PAGES', 3))
+
+# Number of cards whose detail page / image are fetched at the same time
+FETCH_CONCURRENCY = int(os.environ.get('SCRAPER_FETCH_CONCURRENCY', 8))
+
+# Wall time per stage of the current scrape, written to SCRAPE_SUMMARY_FILE at the end
+stages = StageTimer()
 
 def download_image(image_url, event_name):
-    """Download the image from the URL and save it locally, return the local path."""
+    """Fetch the image into the content-addressed store, return the local path."""
     try:
-        # Generate a unique file name based on event name and a UUID
-        safe_name = re.sub(r'[^a-zA-Z0-9]', '_', event_name)[:50]  # Clean event name for file system
-        unique_id = str(uuid.uuid4())[:8]  # Short unique ID
-        file_extension = image_url.split('.')[-1].split('?')[0]  # Extract extension (e.g., jpg, png)
-        if len(file_extension) > 4:  # In case of weird extensions
-            file_extension = 'jpg'
-        file_name = f"{safe_name}_{unique_id}.{file_extension}"
-        file_path = os.path.join(IMAGE_DIR, file_name)
-
-        # Download the image
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36'
-        }
-        response = requests.get(image_url, headers=headers, stream=True, timeout=10)
-        if response.status_code == 200:
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(1024):
-                    f.write(chunk)
-            logging.info(f"Downloaded image for {event_name}: {file_name}")
-            return f"/{file_path}"  # Return the path for the frontend (e.g., /static/images/event.jpg)
-        else:
-            logging.warning(f"Failed to download image for {event_name}: HTTP {response.status_code}")
-            return None
+        with stages.time('image_download'):
+            local_path = image_store.fetch(image_url)
+        if local_path:
+            logging.debug("Image for %s: %s", event_name, local_path)
+        return local_path
     except Exception as e:
         logging.warning(f"Error downloading image for {event_name}: {e}")
         return None
 
+@lru_cache(maxsize=1)
+def chromedriver_path():
+    """Resolve the chromedriver binary once per process instead of once per driver."""
+    return ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install()
+
 def create_driver():
     """Initialize and return a Chrome WebDriver with configured options."""
     try:
@@ -68,7 +96,7 @@ def create_driver():
         options.add_argument('--blink-settings=imagesEnabled=true')
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install()), options=options)
+        driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         logging.info("WebDriver initialized successfully.")
         return driver
@@ -77,195 +105,519 @@ def create_driver():
         print(f"Failed to create WebDriver: {e}")
         return None
 
-def scrape_events():
-    url = "https://www.eventbrite.com.au/d/australia--sydney/events/"
-    driver = create_driver()
-    if not driver:
-        logging.error("WebDriver not created, exiting scraper.")
-        return
+def fetch_detail_image(event_url, name, pool):
+    """Load the event's detail page with a pooled driver and return its hero image URL."""
+    image_url = None
+    with pool.lease(f"detail {event_url}") as detail_driver:
+        if detail_driver:
+            try:
+                rate_limiter.wait(event_url)
+                with stages.time('page_load'):
+                    detail_driver.get(event_url)
+                    WebDriverWait(detail_driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, DETAIL_IMAGE_SELECTOR))
+                    )
+                    html = detail_driver.page_source
+                with stages.time('parse'):
+                    image_url = parse_detail_image(html, event_url)
+            except Exception as e:
+                logging.warning(f"Failed to fetch image from detail page for {name}: {e}")
+                if isinstance(e, WebDriverException) and not isinstance(e, TimeoutException):
+                    pool.invalidate(detail_driver)
+    return image_url
 
-    max_retries = 3
-    for attempt in range(max_retries):
+def fetch_card_assets(card, pool):
+    """I/O stage for one card: resolve a missing image from the detail page, then download it.
+
+    Fills in ``card['image_url']`` and returns the local image path, or None.
+    """
+    try:
+        if not card['image_url']:
+            logging.debug("No image found in card for event: %s, trying detail page: %s", card['name'], card['url'])
+            with stages.time('detail_fetch'):
+                card['image_url'] = fetch_detail_image(card['url'], card['name'], pool)
+        if not card['image_url']:
+            return None
+        local_image_path = download_image(card['image_url'], card['name'])
+        if local_image_path:
+            with stages.time('thumbnails'):
+                generate_thumbnails(local_image_path)
+        return local_image_path
+    except Exception as e:
+        logging.warning(f"Error fetching assets for event {card['name']}: {e}")
+        return None
+
+def fetch_listing_http(url, max_pages=HTTP_MAX_PAGES, prefer_jsonld=True):
+    """Fast path: read the paginated listing with plain HTTP requests.
+
+    Uses embedded JSON-LD event data when a page has it and falls back to the
+    card markup otherwise. Stops at the first page that adds no new events.
+    """
+    cards = []
+    seen_urls = set()
+    session = get_session()
+    for page in range(1, max_pages + 1):
+        page_url = url if page == 1 else f"{url}?page={page}"
         try:
-            logging.info(f"Fetching URL (attempt {attempt + 1}/{max_retries}): {url}")
-            driver.set_page_load_timeout(60)
-            driver.get(url)
-
-            max_scrolls = 10
-            scroll_count = 0
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            while scroll_count < max_scrolls:
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    logging.info("No more events to load.")
-                    break
-                last_height = new_height
-                scroll_count += 1
-                logging.info(f"Scrolled {scroll_count}/{max_scrolls} times.")
+            rate_limiter.wait(page_url)
+            with stages.time('page_load'):
+                response = session.get(page_url, timeout=15)
+        except Exception as e:
+            logging.warning(f"HTTP listing fetch failed for {page_url}: {e}")
+            break
+        if response.status_code != 200:
+            logging.warning(f"HTTP listing fetch for {page_url} returned HTTP {response.status_code}")
+            break
 
-            try:
-                WebDriverWait(driver, 30).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div[class*="event-card"], div[class*="eds-event-card"], div[class*="card"]'))
-                )
-            except TimeoutException as e:
-                logging.error(f"Timeout waiting for event cards: {e}")
-                driver.save_screenshot(f"error_screenshot_{attempt + 1}.png")
-                with open(f"error_page_{attempt + 1}.html", "w", encoding="utf-8") as f:
-                    f.write(driver.page_source)
-                raise
-
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            logging.info(f"Page source length: {len(driver.page_source)}")
+        with stages.time('parse'):
+            page_cards = parse_listing(response.text, url, prefer_jsonld=prefer_jsonld)
+
+        new_cards = [card for card in page_cards if card['url'] not in seen_urls]
+        if not new_cards:
             break
-        except Exception as e:
-            logging.error(f"Failed to fetch URL with Selenium (attempt {attempt + 1}): {e}", exc_info=True)
-            print(f"Failed to fetch URL with Selenium (attempt {attempt + 1}): {e}")
-            driver.save_screenshot(f"error_screenshot_{attempt + 1}.png")
-            with open(f"error_page_{attempt + 1}.html", "w", encoding="utf-8") as f:
-                f.write(driver.page_source)
-            if attempt == max_retries - 1:
-                logging.error("Max retries reached, exiting.")
-                return
-            time.sleep(5)
-        finally:
-            if driver:
-                driver.quit()
-                logging.info("WebDriver closed.")
-
-    # Save page HTML for debugging
-    if 'soup' in locals():
+        seen_urls.update(card['url'] for card in new_cards)
+        cards.extend(page_cards)
+        logging.info(f"HTTP listing page {page}: {len(page_cards)} cards")
+    return cards
+
+def fetch_listing_selenium(url, pool):
+    """Slow path: load the listing in headless Chrome and scroll until it stops growing."""
+    max_retries = 3
+    for attempt in range(max_retries):
+        with pool.lease(f"listing attempt {attempt + 1}") as driver:
+            if not driver:
+                logging.error("WebDriver not created, exiting scraper.")
+                return None
+            try:
+                logging.info(f"Fetching URL (attempt {attempt + 1}/{max_retries}): {url}")
+                driver.set_page_load_timeout(60)
+                with stages.time('page_load'):
+                    driver.get(url)
+
+                scroll_started = time.perf_counter()
+                max_scrolls = 10
+                scroll_count = 0
+                last_height = driver.execute_script("return document.body.scrollHeight")
+                while scroll_count < max_scrolls:
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                    time.sleep(SCROLL_PAUSE)
+                    new_height = driver.execute_script("return document.body.scrollHeight")
+                    if new_height == last_height:
+                        logging.info("No more events to load.")
+                        break
+                    last_height = new_height
+                    scroll_count += 1
+                    logging.info(f"Scrolled {scroll_count}/{max_scrolls} times.")
+                stages.record('scroll', time.perf_counter() - scroll_started)
+
+                try:
+                    WebDriverWait(driver, 30).until(
+                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, CARD_SELECTOR))
+                    )
+                except TimeoutException as e:
+                    logging.error(f"Timeout waiting for event cards: {e}")
+                    raise
+
+                # page_source serializes the whole DOM over the wire, so read it once
+                html = driver.page_source
+                logging.info(f"Page source length: {len(html)}")
+                break
+            except Exception as e:
+                logging.error(f"Failed to fetch URL with Selenium (attempt {attempt + 1}): {e}", exc_info=True)
+                print(f"Failed to fetch URL with Selenium (attempt {attempt + 1}): {e}")
+                try:
+                    driver.save_screenshot(f"error_screenshot_{attempt + 1}.png")
+                    with open(f"error_page_{attempt + 1}.html", "w", encoding="utf-8") as f:
+                        f.write(driver.page_source)
+                except WebDriverException:
+                    pass
+                if isinstance(e, WebDriverException) and not isinstance(e, TimeoutException):
+                    # Don't hand a crashed Chrome to the next attempt
+                    pool.invalidate(driver)
+                if attempt == max_retries - 1:
+                    logging.error("Max retries reached, exiting.")
+                    return None
+        time.sleep(5)
+
+    if DEBUG_DUMP:
         with open('page.html', 'w', encoding='utf-8') as f:
-            f.write(soup.prettify())
+            f.write(html)
 
-    events = []
+    # The rendered DOM holds more events than the JSON-LD block, so parse the cards
+    with stages.time('parse'):
+        cards = parse_listing(html, url, prefer_jsonld=False)
+    logging.info(f"Found {len(cards)} event cards.")
+    print(f"Found {len(cards)} event cards.")
+    return cards
+
+def unique_cards(cards, counters):
+    """Yield cards with a canonical URL, dropping repeats of a URL already seen."""
     seen_urls = set()
+    for card in cards:
+        card['url'] = canonical_url(card['url'])[:200]
+        card['fingerprint'] = card_fingerprint(card)
+        if card['url'] in seen_urls:
+            logging.debug("Skipping duplicate event: %s", card['name'])
+            counters['duplicate'] += 1
+            continue
+        seen_urls.add(card['url'])
+        yield card
+
+def location_cards(cards, counters, keywords):
+    """Yield only cards that mention one of ``keywords`` in their name, description or location."""
+    for card in cards:
+        if not any(keyword in card[field] for keyword in keywords for field in ('name', 'description', 'location')):
+            logging.debug("Skipping event outside %s: %s", '/'.join(keywords), card['name'])
+            counters['other_location'] += 1
+            continue
+        yield card
+
+def card_fingerprint(card):
+    """Hash of what the listing shows for an event; unchanged means no detail/image work."""
+    content = '\x1f'.join(card[field] or '' for field in ('name', 'date', 'description', 'image_url'))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def reusable_image(card, stored, verify_image=False):
+    """Return the stored image path if the card's fingerprint matches its DB row.
+
+    ``stored`` is the (fingerprint, image_url) of the existing row. With
+    ``verify_image`` the card's image URL must also still map to that file in
+    the image store.
+    """
+    fingerprint, image_url = stored or (None, None)
+    if not fingerprint or fingerprint != card['fingerprint'] or not image_url:
+        return None
+    if not os.path.exists(image_url.lstrip('/')):
+        return None
+    if verify_image and card['image_url']:
+        entry = image_store.index.get(card['image_url'])
+        if not entry or os.path.basename(image_url) != entry['file']:
+            return None
+    return image_url
+
+SYNC_FIELDS = ('name', 'date', 'starts_at', 'description', 'image_url', 'fingerprint', 'city', 'source')
+
+def sync_events(events, delete_missing=True, sources=None):
+    """Bring the Event table in line with ``events`` (dicts keyed by URL) in one transaction.
+
+    New URLs are inserted and rows whose fields changed are updated, both
+    stamped with ``last_changed_at``. Every listed row gets ``last_seen_at``,
+    with one bulk UPDATE for the unchanged ones. With ``delete_missing`` rows
+    whose URL is no longer listed are deleted, only among rows from
+    ``sources`` when given (rows without a source count as the default
+    one). Must be called inside an app context. Returns the
+    insert/update/delete counts.
+    """
+    now = datetime.now()
+    existing = {}
+    duplicates = []
+    for event in Event.query.all():
+        if event.url in existing:
+            duplicates.append(event)
+        else:
+            existing[event.url] = event
+
+    inserted = updated = 0
+    unchanged_ids = []
+    for data in events:
+        event = existing.pop(data['url'], None)
+        if event is None:
+            db.session.add(Event(**data, last_seen_at=now, last_changed_at=now))
+            inserted += 1
+            continue
+        changed = False
+        for field in SYNC_FIELDS:
+            if getattr(event, field) != data[field]:
+                setattr(event, field, data[field])
+                changed = True
+        if changed:
+            event.last_seen_at = event.last_changed_at = now
+            updated += 1
+        else:
+            unchanged_ids.append(event.id)
+
+    for start in range(0, len(unchanged_ids), 500):
+        Event.query.filter(Event.id.in_(unchanged_ids[start:start + 500])).update(
+            {Event.last_seen_at: now}, synchronize_session=False)
+
+    # Whatever is left was not in this scrape
+    if delete_missing:
+        vanished = [event for event in existing.values()
+                    if sources is None or (event.source or DEFAULT_SOURCE) in sources] + duplicates
+    else:
+        vanished = duplicates
+    for event in vanished:
+        db.session.delete(event)
 
-    # Updated selector for event cards
-    event_elements = soup.select('div[class*="event-card"], div[class*="eds-event-card"], div[class*="card"]')
-    logging.info(f"Found {len(event_elements)} event elements with selectors.")
-    print(f"Found {len(event_elements)} event elements with selectors.")
+    db.session.commit()
+    counts = {'inserted': inserted, 'updated': updated, 'deleted': len(vanished), 'unchanged': len(unchanged_ids)}
+    logging.info(f"Synced {len(events)} events to the database: {counts}")
+    print(f"Synced {len(events)} events to the database: {counts}")
+    return counts
 
-    for event_div in event_elements:
+def scrape_events(pool_size=None, url=None, driver_factory=create_driver, mode='full', sources=None):
+    """Run one scrape and return a dict of counts and per-stage timings.
+
+    ``mode='full'`` reads the whole listing (falling back to Selenium),
+    re-validates images and deletes events that are no longer listed.
+    ``mode='delta'`` only reads the first SCRAPER_DELTA_MAX_PAGES listing pages
+    over HTTP, skips all work for cards whose fingerprint is unchanged and
+    never deletes, so it is cheap enough to run often.
+
+    ``sources`` names the listing sources to read (default: SCRAPER_SOURCES);
+    several sources are collected in parallel worker processes and merged
+    before the single database sync. ``url`` scrapes just that listing with
+    the default source's rules.
+    """
+    full = mode == 'full'
+    if url:
+        selected = [dict(SOURCES[DEFAULT_SOURCE], name=DEFAULT_SOURCE, url=url)]
+    else:
+        selected = enabled_sources(sources)
+
+    stages.reset()
+    started_at = datetime.now()
+    # Read once here: workers never touch the database
+    with get_app().app_context():
+        known = {url: (fingerprint, image_url) for url, fingerprint, image_url in
+                 db.session.query(Event.url, Event.fingerprint, Event.image_url)}
+
+    results = run_sources(selected, full, pool_size, driver_factory, known)
+    stats = _sync_results(results, full)
+    stats['stages'] = stages.summary()
+    if SCRAPE_SUMMARY_FILE:
         try:
-            # Event Name
-            name_elem = event_div.select_one('h2, h3, [class*="title"]')
-            name = name_elem.text.strip()[:80] if name_elem else "Untitled Event"
-
-            # Date / Time
-            date_elem = event_div.select_one('time, [class*="date"], [class*="time"]')
-            date = date_elem.text.strip()[:120] if date_elem else "No date available"
-
-            # Description
-            desc_elem = event_div.select_one('[class*="description"], [class*="summary"], p:not([class*="availability"])')
-            description = desc_elem.text.strip()[:200] if desc_elem else name
-
-            # Location
-            location_elem = event_div.select_one('[class*="location"], [class*="venue"], [class*="city"]')
-            location = location_elem.text.strip()[:100] if location_elem else ""
-
-            # Event URL
-            url_elem = event_div.select_one('a[href]')
-            event_url = urljoin(url, url_elem['href'])[:200] if url_elem and url_elem.get('href') else url
-
-            # Image extraction
-            image_url = None
-            img_elem = event_div.select_one('img[class*="event-card__image"], img[class*="card-image"], img')
-            if img_elem:
-                src = img_elem.get('src')
-                if src and not src.startswith('data:'):
-                    image_url = urljoin(url, src)
-                else:
-                    src_lazy = img_elem.get('data-src') or img_elem.get('data-lazy')
-                    if src_lazy:
-                        image_url = urljoin(url, src_lazy)
-
-            if not image_url:
-                img_container = event_div.select_one('[style*="background-image"]')
-                if img_container:
-                    style = img_container.get('style', '')
-                    match = re.search(r'background-image:\s*url\(["\']?(.*?)["\']?\)', style)
-                    if match:
-                        image_url = urljoin(url, match.group(1))
-
-            if image_url and 'img.evbuc.com/https' in image_url:
-                try:
-                    decoded_part = unquote(image_url.split('img.evbuc.com/')[1])
-                    image_url = decoded_part
-                except Exception as e:
-                    logging.warning(f"Failed to decode image URL: {e}")
-
-            if not image_url:
-                logging.info(f"No image found in card for event: {name}, trying detail page: {event_url}")
-                detail_driver = create_driver()
-                if detail_driver:
-                    try:
-                        detail_driver.get(event_url)
-                        WebDriverWait(detail_driver, 10).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, 'img[class*="event-image"], img[class*="hero-image"], img'))
-                        )
-                        detail_soup = BeautifulSoup(detail_driver.page_source, 'html.parser')
-                        detail_img = detail_soup.select_one('img[class*="event-image"], img[class*="hero-image"], img')
-                        if detail_img:
-                            src = detail_img.get('src')
-                            if src and not src.startswith('data:'):
-                                image_url = urljoin(event_url, src)
-                            grilling
-                            else:
-                                src_lazy = detail_img.get('data-src') or detail_img.get('data-lazy')
-                                if src_lazy:
-                                    image_url = urljoin(event_url, src_lazy)
-                    except Exception as e:
-                        logging.warning(f"Failed to fetch image from detail page for {name}: {e}")
-                    finally:
-                        detail_driver.quit()
-
-            if not image_url:
-                logging.warning(f"No valid image found for event: {name}, skipping")
-                continue
+            write_summary(SCRAPE_SUMMARY_FILE, dict(stats, started_at=started_at, finished_at=datetime.now()))
+        except OSError as e:
+            logging.warning(f"Could not write scrape summary to {SCRAPE_SUMMARY_FILE}: {e}")
+    return stats
 
-            # Download the image and get the local path
-            local_image_path = download_image(image_url, name)
-            if not local_image_path:
-                logging.warning(f"Failed to download image for event: {name}, skipping")
-                continue
+def run_sources(sources, full, pool_size, driver_factory, known):
+    """Collect every source, in up to SCRAPER_SOURCE_PROCESSES worker processes.
 
-            # Filter events for Sydney
-            if "Sydney" not in name and "Sydney" not in description and "Sydney" not in location:
-                logging.info(f"Skipping non-Sydney event: {name}")
-                continue
+    Returns one result per source, in the order given.
+    """
+    processes = min(SOURCE_PROCESSES, len(sources))
+    if processes <= 1:
+        return [_collect(source, full, pool_size, driver_factory, known) for source in sources]
 
-            # Skip duplicate URLs
-            if event_url in seen_urls:
-                logging.info(f"Skipping duplicate event: {name}")
-                continue
+    # Parallel sources on one host share its request rate
+    hosts = Counter(urlsplit(source['url']).netloc for source in sources)
+    base_interval = rate_limiter.min_interval
+    context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        futures = [executor.submit(_collect, source, full, pool_size, driver_factory, known,
+                                   min_interval=base_interval * min(processes, hosts[urlsplit(source['url']).netloc]),
+                                   in_worker=True)
+                   for source in sources]
+        results = []
+        for source, future in zip(sources, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Source {source['name']} failed: {e}", exc_info=True)
+                result = {'name': source['name'], 'events': None, 'stats': {'error': str(e)}}
+            results.append(result)
 
-            seen_urls.add(event_url)
+    for result in results:
+        stages.merge(result.get('stages', {}))
+        image_store.merge(result.get('images', {}))
+    return results
 
-            # Store the local image path in the database instead of the remote URL
-            events.append(Event(name=name, date=date, description=description, url=event_url, image_url=local_image_path))
-            logging.info(f"Scraped event: {name} with local image: {local_image_path}")
-            print(f"Scraped event: {name} with local image: {local_image_path}")
+def _collect(source, full, pool_size, driver_factory, known, min_interval=None, in_worker=False):
+    """Collect one source with its own driver pool; see ``collect_source``."""
+    if in_worker:
+        stages.reset()
+        reset_session()
+        # Assigned, not scaled: pool workers are reused across sources
+        rate_limiter.min_interval = min_interval
+    images_before = image_store.snapshot() if in_worker else None
 
-        except Exception as e:
-            logging.warning(f"Error parsing event: {e}")
-            print(f"Error parsing event: {e}")
+    def timed_factory():
+        with stages.time('driver_start'):
+            return driver_factory()
+
+    pool = DriverPool(timed_factory, size=pool_size or source['driver_pool_size'] or DRIVER_POOL_SIZE,
+                      max_pages=DRIVER_MAX_PAGES)
+    try:
+        events, stats = collect_source(source, pool, full, known)
+    finally:
+        pool.close()
+    stats['driver_pool'] = pool.stats()
+    result = {'name': source['name'], 'events': events, 'stats': stats}
+    if in_worker:
+        result['stages'] = stages.summary()
+        result['images'] = image_store.changes_since(images_before)
+    return result
+
+def collect_source(source, pool, full, known):
+    """Read one source's listing and fetch what changed; returns (events, stats).
+
+    ``events`` is None when the listing could not be read or had no cards, so
+    the sync leaves that source's rows alone. ``known`` maps stored URLs to their
+    (fingerprint, image_url).
+    """
+    url = source['url']
+    stats = {'listing_path': 'http', 'listing_seconds': 0.0, 'cards': 0, 'events': 0}
+
+    started = time.perf_counter()
+    if full:
+        max_pages = source['http_max_pages'] or HTTP_MAX_PAGES
+    else:
+        max_pages = source['delta_max_pages'] or DELTA_MAX_PAGES
+    cards = fetch_listing_http(url, max_pages=max_pages, prefer_jsonld=source['prefer_jsonld'])
+    if not full and not cards:
+        logging.info(f"Delta scrape found no cards for {source['name']} over HTTP; leaving it to the next full scrape.")
+        return None, stats
+    if full and len(cards) < HTTP_MIN_CARDS and source['selenium_fallback']:
+        logging.info(f"HTTP fast path found {len(cards)} cards for {source['name']} (< {HTTP_MIN_CARDS}), falling back to Selenium.")
+        stats['listing_path'] = 'selenium'
+        cards = fetch_listing_selenium(url, pool)
+    stats['listing_seconds'] = time.perf_counter() - started
+    stages.record('listing', stats['listing_seconds'])
+    logging.info(f"{source['name']} listing fetched via {stats['listing_path']} in {stats['listing_seconds']:.1f}s")
+    print(f"{source['name']} listing fetched via {stats['listing_path']} in {stats['listing_seconds']:.1f}s")
+    if not cards:
+        # An empty listing is a failed read (blocked, or the selectors broke), not a source without events
+        logging.warning(f"No event cards found for {source['name']}; keeping its stored events.")
+        return None, stats
+    stats['cards'] = len(cards)
+
+    # Cheap stages first: nothing below reaches the network until a card
+    # has survived dedupe, the location filter and the unchanged-in-DB check
+    counters = Counter(cards=len(cards))
+    candidates = list(location_cards(unique_cards(cards, counters), counters, source['location_keywords']))
+
+    to_fetch = []
+    for card in candidates:
+        reused = reusable_image(card, known.get(card['url']), verify_image=full)
+        if reused:
+            card['local_image_path'] = reused
+            counters['unchanged'] += 1
+        else:
+            to_fetch.append(card)
+
+    # I/O stage: detail pages and image downloads fan out over a thread pool
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=source['fetch_concurrency'] or FETCH_CONCURRENCY) as executor:
+        for card, local_image_path in zip(to_fetch, executor.map(lambda card: fetch_card_assets(card, pool), to_fetch)):
+            card['local_image_path'] = local_image_path
+    stats['fetch_seconds'] = time.perf_counter() - started
+    counters['fetched'] = len(to_fetch)
+
+    events = []
+    for card in candidates:
+        name = card['name']
+        local_image_path = card['local_image_path']
+        if not card['image_url'] and not local_image_path:
+            logging.warning(f"No valid image found for event: {name}, skipping")
+            counters['no_image'] += 1
+            continue
+
+        if not local_image_path:
+            logging.warning(f"Failed to download image for event: {name}, skipping")
+            counters['download_failed'] += 1
             continue
 
+        # Store the local image path in the database instead of the remote URL
+        events.append({'name': name, 'date': card['date'], 'starts_at': parse_event_date(card['date']),
+                       'description': card['description'], 'url': card['url'], 'image_url': local_image_path,
+                       'fingerprint': card['fingerprint'], 'city': source['city'], 'source': source['name']})
+        logging.debug("Scraped event: %s with local image: %s", name, local_image_path)
+
+    stats['pipeline'] = dict(counters)
+    stats['events'] = len(events)
+    logging.info(f"{source['name']} card pipeline: {stats['pipeline']}")
+    print(f"{source['name']} card pipeline: {stats['pipeline']}")
+    return events, stats
+
+def event_identity(event):
+    """(normalized name, start) used to spot one event listed by two sources under different URLs."""
+    when = event['starts_at'] or event['date']
+    return (' '.join(event['name'].lower().split()), when) if when else None
+
+def merge_events(results, counters):
+    """Concatenate the sources' events in priority order, dropping cross-source repeats.
+
+    An event is a repeat if an earlier source listed its URL, or listed an
+    event with the same name and start time.
+    """
+    seen_urls = set()
+    identities = {}
+    merged = []
+    for result in results:
+        for event in result['events'] or ():
+            identity = event_identity(event)
+            if event['url'] in seen_urls or identities.get(identity, result['name']) != result['name']:
+                counters['cross_source_duplicate'] += 1
+                continue
+            seen_urls.add(event['url'])
+            if identity:
+                identities.setdefault(identity, result['name'])
+            merged.append(event)
+    return merged
+
+def _sync_results(results, full):
+    stats = {'mode': 'full' if full else 'delta', 'sources': {}}
+    counters = Counter()
+    pool_stats = Counter()
+    for result in results:
+        source_stats = result['stats']
+        stats['sources'][result['name']] = source_stats
+        counters.update(source_stats.get('pipeline', {}))
+        for key, value in source_stats.get('driver_pool', {}).items():
+            pool_stats[key] = max(pool_stats[key], value) if key == 'max_wait' else pool_stats[key] + value
+
+    paths = {result['stats']['listing_path'] for result in results if 'listing_path' in result['stats']}
+    stats['listing_path'] = paths.pop() if len(paths) == 1 else 'mixed'
+    # Sources run side by side, so the slowest one is the stage's wall time
+    stats['listing_seconds'] = max((result['stats'].get('listing_seconds', 0.0) for result in results), default=0.0)
+    stats['fetch_seconds'] = max((result['stats'].get('fetch_seconds', 0.0) for result in results), default=0.0)
+    stats['cards'] = sum(result['stats'].get('cards', 0) for result in results)
+    stats['driver_pool'] = dict(pool_stats)
+
+    succeeded = [result['name'] for result in results if result['events'] is not None]
+    events = merge_events(results, counters)
+    stats['pipeline'] = dict(counters)
+    stats['events'] = len(events)
+    if not succeeded:
+        logging.warning("No source could be read; leaving the database as it is.")
+        stats['error'] = 'no source could be read'
+        return stats
+
     # Save events to DB
-    with app.app_context():
+    started = time.perf_counter()
+    with get_app().app_context():
         try:
-            Event.query.delete()
-            db.session.commit()
-            db.session.bulk_save_objects(events)
-            db.session.commit()
-            logging.info(f"Successfully saved {len(events)} events to the database.")
-            print(f"Successfully saved {len(events)} events to the database.")
+            stats.update(sync_events(events, delete_missing=full, sources=succeeded))
+            if stats['inserted'] or stats['updated'] or stats['deleted']:
+                bump_version()
         except Exception as e:
             logging.error(f"Database error: {e}")
-            print(f"Database verleiden: {e}")
+            print(f"Database error: {e}")
+            stats['error'] = f"database error: {e}"[:1000]
             db.session.rollback()
+            image_store.save()
+        else:
+            # Only prune images once the table reflects this scrape
+            referenced = [image_url for (image_url,) in db.session.query(Event.image_url)]
+            stats['images_removed'] = image_store.collect_garbage(referenced) + thumbnails.collect_garbage(referenced)
+    stats['sync_seconds'] = time.perf_counter() - started
+    stages.record('db_sync', stats['sync_seconds'])
+    return stats
 
 if __name__ == '__main__':
-    scrape_events()
+    parser = argparse.ArgumentParser(description="Scrape events from the configured listing sources into the database.")
+    parser.add_argument('mode', nargs='?', choices=('full', 'delta'), default='full')
+    parser.add_argument('--source', action='append', choices=list(SOURCES), dest='sources',
+                        help="scrape this source (repeatable; default: SCRAPER_SOURCES)")
+    parser.add_argument('--stats-file', help="write the run's stats here as JSON")
+    args = parser.parse_args()
+    stats = scrape_events(mode=args.mode, sources=args.sources)
+    if args.stats_file:
+        with open(args.stats_file, 'w', encoding='utf-8') as f:
+            json.dump(stats, f)
+    if stats.get('error'):
+        # The scheduler records a non-zero exit as a failed run
+        print(f"Scrape failed: {stats['error']}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,231 @@
+"""Scheduling, locking and run history for the scraper.
+
+Each run happens in a child process (``python scrape_events.py <mode>``) so
+it can be killed, Chrome included, once it exceeds SCRAPER_MAX_RUNTIME_MINUTES.
+A file lock makes sure only one run is active per host, and every attempt
+is recorded in the scrape_run table. A second, long-lived lock elects one
+scheduler per host: every web worker with SCRAPER_EMBEDDED=1 (and
+run_scraper.py) competes for it, only the holder schedules jobs, and the
+others take over if it exits.
+"""
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from apscheduler.executors.pool import ThreadPoolExecutor # type: ignore
+from apscheduler.triggers.cron import CronTrigger # type: ignore
+from apscheduler.triggers.interval import IntervalTrigger # type: ignore
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCK_FILE = os.environ.get('SCRAPER_LOCK_FILE', os.path.join(BASE_DIR, 'scrape.lock'))
+# Held for its whole life by the one process that runs the scheduler
+SCHEDULER_LOCK_FILE = os.environ.get('SCRAPER_SCHEDULER_LOCK_FILE', os.path.join(BASE_DIR, 'scheduler.lock'))
+LEADER_RETRY_SECONDS = 60
+MAX_RUNTIME_MINUTES = float(os.environ.get('SCRAPER_MAX_RUNTIME_MINUTES', 45))
+JITTER_SECONDS = int(os.environ.get('SCRAPER_JITTER_SECONDS', 120))
+RUN_ON_START = os.environ.get('SCRAPER_RUN_ON_START', 'true').lower() in ('1', 'true', 'yes')
+
+# Crontab expressions win over the plain intervals when set
+DELTA_CRON = os.environ.get('SCRAPER_DELTA_CRON')
+FULL_CRON = os.environ.get('SCRAPER_FULL_CRON')
+DELTA_INTERVAL_MINUTES = int(os.environ.get('SCRAPER_DELTA_MINUTES', 60))
+FULL_INTERVAL_HOURS = int(os.environ.get('SCRAPER_FULL_HOURS', 24))
+
+logger = logging.getLogger('scrape_scheduler')
+
+
+class ScrapeLock:
+    """Non-blocking, cross-process exclusive lock on a file.
+
+    The OS drops the lock when the holder dies, so a crashed run never leaves
+    a stale lock behind.
+    """
+
+    def __init__(self, path=LOCK_FILE):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        self._file = open(self.path, 'a+')
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            self._file.close()
+            self._file = None
+            return False
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+
+def _kill(process):
+    """Terminate the scrape and everything it started (chromedriver, Chrome)."""
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+def _record(run_id=None, **fields):
+    """Insert or update a ScrapeRun row; history problems never break a scrape."""
+    from models import ScrapeRun, db, get_app
+    try:
+        with get_app().app_context():
+            run = db.session.get(ScrapeRun, run_id) if run_id else ScrapeRun()
+            for name, value in fields.items():
+                setattr(run, name, value)
+            db.session.add(run)
+            db.session.commit()
+            return run.id
+    except Exception as e:
+        logger.error(f"Could not record scrape run: {e}")
+        return run_id
+
+
+def run_scrape(mode='full', max_runtime_minutes=MAX_RUNTIME_MINUTES):
+    """Run one scrape under the lock and time limit, recording it in scrape_run.
+
+    Returns the final status: success, failed, timeout or skipped.
+    """
+    started_at = datetime.now()
+    lock = ScrapeLock()
+    if not lock.acquire():
+        logger.info(f"Skipping {mode} scrape: another scrape holds {lock.path}")
+        _record(mode=mode, status='skipped', started_at=started_at, finished_at=started_at, duration_seconds=0.0,
+                error='another scrape was running')
+        return 'skipped'
+
+    run_id = _record(mode=mode, status='running', started_at=started_at)
+    fd, stats_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    started = time.monotonic()
+    status, error, stats = 'failed', None, {}
+    try:
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(BASE_DIR, 'scrape_events.py'), mode, '--stats-file', stats_path],
+            cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+            start_new_session=hasattr(os, 'killpg'))
+        try:
+            _, stderr = process.communicate(timeout=max_runtime_minutes * 60)
+        except subprocess.TimeoutExpired:
+            _kill(process)
+            status, error = 'timeout', f"killed after {max_runtime_minutes:g} minutes"
+        else:
+            try:
+                with open(stats_path, encoding='utf-8') as f:
+                    stats = json.load(f) or {}
+            except (OSError, ValueError):
+                stats = {}
+            if process.returncode == 0 and not stats.get('error'):
+                status = 'success'
+            elif stats.get('error'):
+                # The scrape ran but could not read any source or sync the database
+                error = str(stats['error'])[:1000]
+            else:
+                error = (stderr or '').strip().splitlines()[-1:] or [f"exit code {process.returncode}"]
+                error = error[0][:1000]
+    except Exception as e:
+        error = str(e)
+    finally:
+        lock.release()
+        os.remove(stats_path)
+
+    duration = time.monotonic() - started
+    _record(run_id, status=status, finished_at=datetime.now(), duration_seconds=duration, error=error,
+            listing_path=stats.get('listing_path'), cards=stats.get('cards'), events=stats.get('events'),
+            inserted=stats.get('inserted'), updated=stats.get('updated'), deleted=stats.get('deleted'))
+    logger.info(f"{mode} scrape finished: {status} in {duration:.1f}s {error or ''}")
+    return status
+
+
+def _trigger(cron, **interval):
+    if cron:
+        return CronTrigger.from_crontab(cron, jitter=JITTER_SECONDS)
+    return IntervalTrigger(jitter=JITTER_SECONDS, **interval)
+
+
+def configure(scheduler):
+    """Add the delta and full scrape jobs to an APScheduler scheduler."""
+    scheduler.add_job(run_scrape, _trigger(DELTA_CRON, minutes=DELTA_INTERVAL_MINUTES),
+                      kwargs={'mode': 'delta'}, id='delta_scrape', replace_existing=True)
+    full_job = scheduler.add_job(run_scrape, _trigger(FULL_CRON, hours=FULL_INTERVAL_HOURS),
+                                 kwargs={'mode': 'full'}, id='full_scrape', replace_existing=True)
+    if RUN_ON_START:
+        full_job.modify(next_run_time=datetime.now())
+    return scheduler
+
+
+def _scheduler_options():
+    # One worker thread, so jobs of one scheduler queue up instead of overlapping
+    return {'executors': {'default': ThreadPoolExecutor(1)},
+            'job_defaults': {'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 600}}
+
+
+# Referenced for the life of the process: closing the file would release the lock
+_leader_lock = ScrapeLock(SCHEDULER_LOCK_FILE)
+
+
+def _wait_for_leadership():
+    while not _leader_lock.acquire():
+        time.sleep(LEADER_RETRY_SECONDS)
+
+
+def run_blocking():
+    """Run the scheduler in the foreground (python run_scraper.py), once no other scheduler runs."""
+    from apscheduler.schedulers.blocking import BlockingScheduler # type: ignore
+    if not _leader_lock.acquire():
+        logger.info(f"Another scheduler holds {SCHEDULER_LOCK_FILE}; waiting to take over.")
+        _wait_for_leadership()
+    configure(BlockingScheduler(**_scheduler_options())).start()
+
+
+def start_background_scheduler():
+    """Start the scheduler on a background thread, e.g. inside the web process.
+
+    Every worker calls this, but only the one holding SCHEDULER_LOCK_FILE
+    schedules jobs; the rest wait on a daemon thread to take over from it.
+    """
+    def lead():
+        _wait_for_leadership()
+        from apscheduler.schedulers.background import BackgroundScheduler # type: ignore
+        configure(BackgroundScheduler(daemon=True, **_scheduler_options())).start()
+        logger.info(f"Embedded scrape scheduler started in process {os.getpid()}.")
+
+    threading.Thread(target=lead, name='scrape-scheduler-leader', daemon=True).start()
@@ -0,0 +1,58 @@
+"""DDL for the event search index, shared by the migrations and migrations/env.py.
+
+On SQLite the index is an external-content FTS5 table (``event_fts`` plus
+its ``event_fts_*`` shadow tables) kept in sync by triggers on ``event``; on
+Postgres it is the GIN index ``ix_event_search``. None of it is in the
+models, so autogenerate must ignore it, and since SQLite drops a table's
+triggers when a batch migration recreates it, any migration that
+batch-alters ``event`` calls ``create_fts_triggers()`` afterwards.
+"""
+from sqlalchemy import text
+
+FTS_TABLE = 'event_fts'
+POSTGRES_INDEX = 'ix_event_search'
+
+FTS_TRIGGERS = {
+    'event_fts_insert': """
+        CREATE TRIGGER event_fts_insert AFTER INSERT ON event BEGIN
+            INSERT INTO event_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+    'event_fts_delete': """
+        CREATE TRIGGER event_fts_delete AFTER DELETE ON event BEGIN
+            INSERT INTO event_fts(event_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    'event_fts_update': """
+        CREATE TRIGGER event_fts_update AFTER UPDATE OF name, description ON event BEGIN
+            INSERT INTO event_fts(event_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO event_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+
+def is_search_index_object(name):
+    """True for the FTS5 table, its shadow tables and triggers, and the Postgres GIN index."""
+    return name == POSTGRES_INDEX or name == FTS_TABLE or name.startswith(FTS_TABLE + '_')
+
+
+def create_fts_triggers(op, rebuild=False):
+    """(Re)create the FTS sync triggers if the FTS table exists; a no-op elsewhere."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    exists = bind.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                          {'name': FTS_TABLE}).first()
+    if not exists:
+        return
+    for name, ddl in FTS_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute(ddl)
+    if rebuild:
+        op.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_fts_triggers(op):
+    for name in reversed(list(FTS_TRIGGERS)):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
@@ -0,0 +1,61 @@
+"""Listing sources the scraper can read.
+
+Each source is a listing URL plus the rules for reading it:
+
+``city``
+    stored on every event from the source
+``location_keywords``
+    a card must mention one of these in its name, description or location
+``prefer_jsonld``
+    use embedded JSON-LD events when a listing page has them
+``http_max_pages`` / ``delta_max_pages``
+    listing pages read over HTTP by full / delta scrapes
+``selenium_fallback``
+    render the listing in Chrome when HTTP finds too few cards
+``fetch_concurrency`` / ``driver_pool_size``
+    cap on parallel detail-page and image fetches for the source
+
+Rules left as None use the scraper's SCRAPER_* defaults. SCRAPER_SOURCES picks the sources to scrape (comma-separated names).
+"""
+import os
+
+EVENTBRITE_CITY_URL = "https://www.eventbrite.com.au/d/australia--{slug}/events/"
+
+DEFAULT_SOURCE = 'eventbrite-sydney'
+
+
+def eventbrite_city(city, slug=None, **rules):
+    source = {
+        'city': city,
+        'url': EVENTBRITE_CITY_URL.format(slug=slug or city.lower()),
+        'location_keywords': (city,),
+        'prefer_jsonld': True,
+        'http_max_pages': None,
+        'delta_max_pages': None,
+        'selenium_fallback': True,
+        'fetch_concurrency': None,
+        'driver_pool_size': None,
+    }
+    source.update(rules)
+    return source
+
+
+# Registry order is priority order: when two sources list the same event, the first one keeps it
+SOURCES = {
+    'eventbrite-sydney': eventbrite_city('Sydney'),
+    'eventbrite-melbourne': eventbrite_city('Melbourne'),
+    'eventbrite-brisbane': eventbrite_city('Brisbane'),
+    'eventbrite-perth': eventbrite_city('Perth'),
+    'eventbrite-adelaide': eventbrite_city('Adelaide'),
+    'eventbrite-canberra': eventbrite_city('Canberra', location_keywords=('Canberra', 'ACT')),
+}
+
+
+def enabled_sources(names=None):
+    """Return the named sources (default: SCRAPER_SOURCES) in registry order, each with its ``name``."""
+    if names is None:
+        names = [name.strip() for name in os.environ.get('SCRAPER_SOURCES', DEFAULT_SOURCE).split(',') if name.strip()]
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown scraper source(s): {', '.join(unknown)}; known: {', '.join(SOURCES)}")
+    return [dict(SOURCES[name], name=name) for name in SOURCES if name in names]
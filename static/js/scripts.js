@@ -1,60 +1,75 @@
+// Infinite scroll for the event list. The server renders the first page;
+// further pages come from the paginated /api/events and are appended in one
+// DOM operation per page. Without JavaScript the "More events" link still
+// pages through the list.
 document.addEventListener('DOMContentLoaded', function() {
-    fetch('/api/events')
-        .then(response => {
-            if (!response.ok) throw new Error('Failed to fetch events');
-            return response.json();
-        })
-        .then(data => {
-            const container = document.getElementById('events-container');
-            if (data.length === 0) {
-                container.innerHTML = '<p>No events found.</p>';
-                return;
-            }
-            data.forEach(event => {
-                const eventDiv = document.createElement('div');
-                eventDiv.className = 'event';
-                eventDiv.innerHTML = `
-                    <h2>${event.name}</h2>
-                    <p><strong>Date:</strong> ${event.date}</p>
-                    <p><strong>Description:</strong> ${event.description}</p>
-                    <form class="ticket-form" data-url="${event.url}">
-                        <input type="email" name="email" placeholder="Enter your email" required>
-                        <button type="submit">Get Tickets</button>
-                    </form>
-                `;
-                container.appendChild(eventDiv);
-            });
+    const container = document.getElementById('events-container');
+    const more = document.getElementById('events-more');
+    const template = document.getElementById('event-card-template');
+    if (!container || !more || !template || !more.dataset.api) return;
+
+    let nextPage = more.dataset.api;
+    let loading = false;
+    // Start fetching the next page well before the visitor reaches the end
+    const observer = 'IntersectionObserver' in window
+        ? new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) loadMore();
+        }, { rootMargin: '1200px 0px' })
+        : null;
+
+    function buildCard(event) {
+        const card = template.content.firstElementChild.cloneNode(true);
+        const img = card.querySelector('img');
+        img.src = event.image_url;
+        img.alt = event.name;
+        if (event.image_srcset) {
+            img.srcset = event.image_srcset;
+        }
+        card.querySelector('h2').textContent = event.name;
+        card.querySelector('.event-date').textContent = event.date;
+        card.querySelector('.event-description').textContent = event.description;
+        card.querySelector('a').href = event.url;
+        card.querySelector('input[name="url"]').value = event.url;
+        return card;
+    }
 
-            // Add event listeners to forms
-            document.querySelectorAll('.ticket-form').forEach(form => {
-                form.addEventListener('submit', function(e) {
-                    e.preventDefault();
-                    const email = form.querySelector('input[name="email"]').value;
-                    const url = form.dataset.url;
-                    fetch('/get_tickets', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/x-www-form-urlencoded',
-                        },
-                        body: `email=${encodeURIComponent(email)}&url=${encodeURIComponent(url)}`
-                    })
-                    .then(response => {
-                        if (!response.ok) throw new Error('Failed to submit email');
-                        return response.json();
-                    })
-                    .then(data => {
-                        alert(data.message);
-                        window.location.href = data.url;
-                    })
-                    .catch(error => {
-                        console.error('Error submitting email:', error);
-                        alert('Error submitting email. Please try again.');
-                    });
-                });
+    function loadMore() {
+        if (loading || !nextPage) return;
+        loading = true;
+        fetch(nextPage, { headers: { 'Accept': 'application/json' } })
+            .then(response => {
+                if (!response.ok) throw new Error('Failed to fetch events');
+                const cursor = response.headers.get('X-Next-Cursor');
+                return response.json().then(events => ({ events, cursor }));
+            })
+            .then(({ events, cursor }) => {
+                const fragment = document.createDocumentFragment();
+                events.forEach(event => fragment.appendChild(buildCard(event)));
+                container.appendChild(fragment);
+
+                if (cursor) {
+                    const url = new URL(nextPage, window.location.href);
+                    url.searchParams.set('cursor', cursor);
+                    nextPage = url.pathname + url.search;
+                    more.href = '?cursor=' + encodeURIComponent(cursor);
+                } else {
+                    nextPage = null;
+                    if (observer) observer.disconnect();
+                    more.remove();
+                }
+            })
+            .catch(error => {
+                console.error('Error fetching events:', error);
+                more.textContent = 'Could not load more events. Tap to retry.';
+            })
+            .finally(() => {
+                loading = false;
             });
-        })
-        .catch(error => {
-            console.error('Error fetching events:', error);
-            document.getElementById('events-container').innerHTML = '<p>Error loading events. Please try again later.</p>';
-        });
+    }
+
+    more.addEventListener('click', function(e) {
+        e.preventDefault();
+        loadMore();
+    });
+    if (observer) observer.observe(more);
 });
\ No newline at end of file
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+from event_dates import parse_event_date
+
+# A Wednesday, mid-afternoon
+NOW = datetime(2025, 6, 4, 15, 30)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Wednesday at 7:00 PM', datetime(2025, 6, 4, 19, 0)),
+    ('Wednesday at 10:00 AM', datetime(2025, 6, 11, 10, 0)),
+    ('Wednesday', datetime(2025, 6, 4, 0, 0)),
+    ('Friday at 8pm', datetime(2025, 6, 6, 20, 0)),
+    ('Mon 6:30 PM', datetime(2025, 6, 9, 18, 30)),
+    ('Thurs, 9am', datetime(2025, 6, 5, 9, 0)),
+    ('Sunday at 11am + 3 more', datetime(2025, 6, 8, 11, 0)),
+])
+def test_bare_weekday_is_next_occurrence(text, expected):
+    assert parse_event_date(text, now=NOW) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Sat, Jun 7 • 7:00 PM', datetime(2025, 6, 7, 19, 0)),
+    ('Tomorrow at 6pm', datetime(2025, 6, 5, 18, 0)),
+    ('7 June 2025, 10:00am', datetime(2025, 6, 7, 10, 0)),
+    ('2025-06-07T19:00:00Z', datetime(2025, 6, 7, 19, 0)),
+])
+def test_explicit_dates_ignore_weekday(text, expected):
+    assert parse_event_date(text, now=NOW) == expected
+
+
+def test_unparseable_is_none():
+    assert parse_event_date('Doors open soon', now=NOW) is None
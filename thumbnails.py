@@ -0,0 +1,91 @@
+import logging
+import os
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed where thumbnails are generated
+    Image = None
+
+IMAGE_DIR = os.path.join("static", "images")
+THUMB_DIR = os.path.join(IMAGE_DIR, "thumbs")
+
+# Rendered width of the card image and its 2x variant for high-DPI screens
+THUMB_WIDTHS = (200, 400)
+THUMB_QUALITY = 75
+
+
+def thumbnail_name(image_path, width):
+    """Name of the ``width`` px WebP derivative of a stored image."""
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    return f"{stem}-{width}w.webp"
+
+
+def thumbnail_urls(image_url):
+    """Map width -> public URL for every derivative of a local image that exists on disk."""
+    if not image_url or not image_url.startswith(f"/{IMAGE_DIR}/".replace(os.sep, '/')):
+        return {}
+    urls = {}
+    for width in THUMB_WIDTHS:
+        name = thumbnail_name(image_url, width)
+        if os.path.exists(os.path.join(THUMB_DIR, name)):
+            urls[width] = f"/{THUMB_DIR}/{name}".replace(os.sep, '/')
+    return urls
+
+
+def generate_thumbnails(image_url):
+    """Write the WebP derivatives of a stored image, skipping ones that already exist.
+
+    ``image_url`` is the public path returned by the image store. Returns the
+    number of files written; does nothing if Pillow is not installed.
+    """
+    if Image is None:
+        return 0
+    source_path = image_url.lstrip('/')
+    os.makedirs(THUMB_DIR, exist_ok=True)
+    pending = [width for width in THUMB_WIDTHS
+               if not os.path.exists(os.path.join(THUMB_DIR, thumbnail_name(source_path, width)))]
+    if not pending:
+        return 0
+
+    written = 0
+    try:
+        with Image.open(source_path) as image:
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            for width in pending:
+                target = os.path.join(THUMB_DIR, thumbnail_name(source_path, width))
+                if image.width > width:
+                    height = round(image.height * width / image.width)
+                    resized = image.resize((width, height), Image.LANCZOS)
+                else:
+                    resized = image
+                tmp_path = target + '.tmp'
+                resized.save(tmp_path, 'WEBP', quality=THUMB_QUALITY, method=4)
+                os.replace(tmp_path, target)
+                written += 1
+    except Exception as e:
+        logging.warning(f"Failed to generate thumbnails for {source_path}: {e}")
+    return written
+
+
+def collect_garbage(referenced_paths):
+    """Delete derivatives whose source image is no longer referenced by any event."""
+    if not os.path.isdir(THUMB_DIR):
+        return 0
+    keep = {thumbnail_name(path, width) for path in referenced_paths if path for width in THUMB_WIDTHS}
+    removed = 0
+    for file_name in os.listdir(THUMB_DIR):
+        if file_name not in keep:
+            os.remove(os.path.join(THUMB_DIR, file_name))
+            removed += 1
+    return removed
+
+
+if __name__ == '__main__':
+    # Offline backfill for images downloaded before thumbnails existed
+    logging.basicConfig(level=logging.INFO)
+    total = 0
+    for file_name in sorted(os.listdir(IMAGE_DIR)):
+        path = os.path.join(IMAGE_DIR, file_name)
+        if os.path.isfile(path) and not file_name.endswith('.json'):
+            total += generate_thumbnails(f"/{path}")
+    print(f"Generated {total} thumbnail(s).")
@@ -0,0 +1,206 @@
+"""Batched write path for ticket requests.
+
+Web requests do not commit ticket requests themselves. They put them on a
+bounded in-process queue, and one writer thread inserts and verifies them in
+batches, one commit per batch. Under a burst, N concurrent submissions cost
+one SQLite write lock instead of N.
+
+Durability: with ``ack='commit'`` (the default) ``submit`` waits until the
+batch holding the request has been committed, so an acknowledged request
+is on disk. With ``ack='queued'`` it returns as soon as the request is
+queued, and a crash can lose up to ``flush_interval`` worth of requests.
+When the queue is full ``submit`` raises ``IntakeBusy`` instead of piling
+up threads; callers should ask the user to retry.
+
+OTPs are kept in a short-lived in-memory store so verification needs no
+database read. The database stays the system of record: a store miss
+(expired entry, restarted or different worker) falls back to a query by
+``request_key``.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from models import TicketRequest, db
+
+logger = logging.getLogger(__name__)
+
+
+class IntakeBusy(Exception):
+    """The ticket queue is full; the request was not accepted."""
+
+
+class OtpStore:
+    """Thread-safe map of request key -> pending OTP, bounded and expiring."""
+
+    def __init__(self, ttl=600, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key, otp, event_url, email):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, otp, event_url, email)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get(self, key):
+        """Return (otp, event_url, email), or None when unknown or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            return item[1:]
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class TicketWriter:
+    """Single background thread that group-commits queued ticket operations."""
+
+    def __init__(self, app, max_queue=1000, batch_size=100, flush_interval=0.05, ack='commit', ack_timeout=5.0):
+        if ack not in ('commit', 'queued'):
+            raise ValueError(f"ack must be 'commit' or 'queued', not {ack!r}")
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ack = ack
+        self.ack_timeout = ack_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stopping = False
+        self.stats = {'batches': 0, 'inserted': 0, 'verified': 0, 'rejected': 0, 'failed': 0}
+
+    def _ensure_started(self):
+        # Started lazily, and again after a fork, so preloading WSGI servers get one writer per worker
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='ticket-writer', daemon=True)
+                self._thread.start()
+
+    def _submit(self, op, payload):
+        self._ensure_started()
+        future = Future()
+        try:
+            self._queue.put((op, payload, future), timeout=0.1)
+        except queue.Full:
+            self.stats['rejected'] += 1
+            raise IntakeBusy()
+        if self.ack == 'commit':
+            try:
+                future.result(timeout=self.ack_timeout)
+            except FutureTimeout:
+                # Still queued and may commit later, but it was not acknowledged in time
+                raise IntakeBusy()
+        return future
+
+    def submit(self, email, event_url, dob, otp):
+        """Queue a new ticket request and return its request key."""
+        key = uuid.uuid4().hex
+        self._submit('insert', {'request_key': key, 'email': email, 'event_url': event_url,
+                                'dob': dob, 'otp': otp, 'verified': False, 'created_at': datetime.now()})
+        return key
+
+    def mark_verified(self, key):
+        self._submit('verify', key)
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=1.0)]
+            except queue.Empty:
+                if self._stopping:
+                    return
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _write(self, rows, verified):
+        with self.app.app_context():
+            try:
+                # Inserts go first, so a verification queued right after its submission finds the row
+                if rows:
+                    db.session.execute(insert(TicketRequest), rows)
+                if verified:
+                    TicketRequest.query.filter(TicketRequest.request_key.in_(verified)).update(
+                        {TicketRequest.verified: True}, synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _flush(self, batch):
+        rows = [payload for op, payload, _ in batch if op == 'insert']
+        verified = [payload for op, payload, _ in batch if op == 'verify']
+        try:
+            self._write(rows, verified)
+        except Exception as e:
+            # One bad row (too long, duplicate key) must not fail everyone else's request
+            # Only the exception type: SQLAlchemy's message carries every row's email, dob and OTP
+            logger.warning(f"Ticket batch of {len(batch)} failed ({type(e).__name__}); retrying its requests one by one")
+            self._flush_each(batch)
+            return
+        self.stats['batches'] += 1
+        self.stats['inserted'] += len(rows)
+        self.stats['verified'] += len(verified)
+        for _, _, future in batch:
+            future.set_result(None)
+
+    def _flush_each(self, batch):
+        ordered = [item for item in batch if item[0] == 'insert'] + [item for item in batch if item[0] == 'verify']
+        for op, payload, future in ordered:
+            try:
+                if op == 'insert':
+                    self._write([payload], [])
+                else:
+                    self._write([], [payload])
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"Ticket {op} failed: {type(e).__name__}")
+                future.set_exception(e)
+                continue
+            self.stats['inserted' if op == 'insert' else 'verified'] += 1
+            future.set_result(None)
+
+    def close(self, timeout=10.0):
+        """Flush everything still queued and stop the writer thread."""
+        self._stopping = True
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+
+def create_intake(app):
+    """Build the writer and OTP store from the app's TICKET_* config."""
+    config = app.config
+    writer = TicketWriter(app, max_queue=config['TICKET_QUEUE_SIZE'], batch_size=config['TICKET_BATCH_SIZE'],
+                          flush_interval=config['TICKET_FLUSH_INTERVAL'], ack=config['TICKET_WRITE_ACK'])
+    atexit.register(writer.close)
+    return writer, OtpStore(ttl=config['TICKET_OTP_TTL'])